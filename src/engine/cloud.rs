@@ -1,13 +1,14 @@
 use std::time::Duration;
 
 use async_trait::async_trait;
+use bytes::Bytes;
 use futures_util::StreamExt;
-use reqwest::header::ACCEPT;
+use reqwest::header::{HeaderMap, HeaderValue, ACCEPT, CONTENT_TYPE};
 use serde::Serialize;
 
 use crate::engine::{
-    env_duration_seconds, env_optional_string, env_string, send_with_retry, AudioStream, Engine,
-    EngineAudio, EngineError, EngineRequest, EngineResponse,
+    env_duration_seconds, env_optional_string, env_string, http_client_builder, send_with_retry,
+    AssistantText, AudioStream, Engine, EngineAudio, EngineError, EngineRequest, EngineResponse,
 };
 use crate::protocol::{AudioOutput, AudioStreamFormat};
 
@@ -40,9 +41,11 @@ pub struct CloudEngine {
 
 impl CloudEngine {
     pub fn new(config: CloudEngineConfig) -> Result<Self, EngineError> {
-        let client = reqwest::Client::builder()
-            .user_agent("BookOfBooks/1.0")
-            .timeout(config.timeout)
+        let headers = HeaderMap::from_iter([
+            (ACCEPT, HeaderValue::from_static("audio/mpeg")),
+            (CONTENT_TYPE, HeaderValue::from_static("application/json")),
+        ]);
+        let client = http_client_builder(config.timeout, headers)
             .build()
             .map_err(|err| EngineError::CloudRequest(err.to_string()))?;
         Ok(Self { client, config })
@@ -59,14 +62,15 @@ impl Engine for CloudEngine {
             tenant_id: self.config.tenant_id.as_deref(),
         };
 
-        let response = send_with_retry(|| {
-            self.client
-                .post(&self.config.api_url)
-                .header(ACCEPT, "audio/mpeg")
-                .json(&payload)
-        })
-        .await
-        .map_err(|err| EngineError::CloudRequest(err.to_string()))?;
+        // Encode once; retries resend the same bytes.
+        let body = Bytes::from(
+            serde_json::to_vec(&payload)
+                .map_err(|err| EngineError::CloudRequest(err.to_string()))?,
+        );
+        let response =
+            send_with_retry(|| self.client.post(&self.config.api_url).body(body.clone()))
+                .await
+                .map_err(|err| EngineError::CloudRequest(err.to_string()))?;
 
         let response = response
             .error_for_status()
@@ -74,7 +78,7 @@ impl Engine for CloudEngine {
 
         if self.config.stream_audio {
             Ok(EngineResponse {
-                assistant_text: None,
+                assistant_text: AssistantText::Unavailable,
                 audio: EngineAudio::Stream(AudioStream {
                     format: AudioStreamFormat::Mp3,
                     stream: Box::pin(response.bytes_stream().map(|chunk| {
@@ -88,9 +92,10 @@ impl Engine for CloudEngine {
                 .await
                 .map_err(|err| EngineError::CloudRequest(err.to_string()))?;
             Ok(EngineResponse {
-                assistant_text: None,
+                assistant_text: AssistantText::Unavailable,
+                // Takes over the response buffer rather than copying it.
                 audio: EngineAudio::Full(AudioOutput::Mp3 {
-                    data: data.to_vec(),
+                    data: Vec::from(data),
                 }),
             })
         }
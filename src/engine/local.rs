@@ -1,18 +1,22 @@
-use std::sync::OnceLock;
+use std::collections::VecDeque;
+use std::pin::Pin;
+use std::sync::{Arc, Mutex};
 use std::time::Duration;
 
 use async_trait::async_trait;
 use bytes::Bytes;
-use futures_util::StreamExt;
-use regex::Regex;
-use reqwest::header::CONTENT_TYPE;
-use serde::{Deserialize, Serialize};
+use futures_util::{Stream, StreamExt};
+use reqwest::header::{HeaderMap, HeaderValue, CONTENT_TYPE};
+use serde::{Deserialize, Serialize, Serializer};
+use tokio::sync::{mpsc, oneshot};
+use tokio::task::JoinHandle;
 use tokio_tungstenite::tungstenite::Message;
 use url::Url;
 
 use crate::engine::{
-    env_duration_seconds, env_optional_f32, env_optional_string, env_optional_u32, env_string,
-    send_with_retry, AudioStream, Engine, EngineAudio, EngineError, EngineRequest, EngineResponse,
+    env_bool, env_duration_seconds, env_optional_f32, env_optional_string, env_optional_u32,
+    env_string, http_client_builder, send_with_retry, AssistantText, AudioStream, ChatMessage,
+    Engine, EngineAudio, EngineError, EngineRequest, EngineResponse,
 };
 use crate::protocol::{AudioOutput, AudioStreamFormat};
 
@@ -87,6 +91,11 @@ pub struct LocalEngineConfig {
     pub vibevoice_sample_rate: u32,
     pub vibevoice_channels: u16,
     pub llm_timeout: Duration,
+    /// Number of LLM replies to keep for identical requests; 0 disables it.
+    pub llm_cache_size: usize,
+    /// Stream the LLM reply and synthesize it sentence by sentence while it is
+    /// still being generated. Only applies when `stream_audio` is set.
+    pub llm_stream: bool,
     pub stream_audio: bool,
 }
 
@@ -106,6 +115,8 @@ impl LocalEngineConfig {
                 .and_then(|value| u16::try_from(value).ok())
                 .unwrap_or(1),
             llm_timeout: env_duration_seconds("LLM_TIMEOUT_SECONDS", 15.0),
+            llm_cache_size: env_optional_u32("LLM_CACHE_SIZE").unwrap_or(0) as usize,
+            llm_stream: env_bool("LLM_STREAM", true),
             stream_audio: true,
         }
     }
@@ -116,79 +127,267 @@ struct LlmClient {
     client: reqwest::Client,
     api_url: String,
     model: String,
-    system_prompt: String,
+    /// `None` when the configured prompt is blank, so `call` skips it.
+    system_prompt: Option<String>,
+    cache: Option<Arc<Mutex<LlmCache>>>,
 }
 
 impl LlmClient {
     fn new(config: &LocalEngineConfig) -> Result<Self, EngineError> {
-        let client = reqwest::Client::builder()
-            .timeout(config.llm_timeout)
-            .user_agent("BookOfBooks/1.0")
+        let headers =
+            HeaderMap::from_iter([(CONTENT_TYPE, HeaderValue::from_static("application/json"))]);
+        let client = http_client_builder(config.llm_timeout, headers)
             .build()
             .map_err(|err| EngineError::LlmRequest(err.to_string()))?;
         Ok(Self {
             client,
             api_url: config.llm_api_url.clone(),
             model: config.llm_model.clone(),
-            system_prompt: config.system_prompt.clone(),
+            system_prompt: Some(config.system_prompt.clone())
+                .filter(|prompt| !prompt.trim().is_empty()),
+            cache: (config.llm_cache_size > 0)
+                .then(|| Arc::new(Mutex::new(LlmCache::new(config.llm_cache_size)))),
         })
     }
 
-    async fn call(&self, history: &[crate::engine::ChatMessage]) -> Result<String, EngineError> {
-        let mut messages = Vec::with_capacity(history.len() + 1);
-        if !self.system_prompt.trim().is_empty() {
-            messages.push(LlmMessage {
-                role: "system".to_string(),
-                content: self.system_prompt.clone(),
-            });
+    async fn call(&self, history: &[ChatMessage]) -> Result<String, EngineError> {
+        let body = self.encode_request(history, false)?;
+        if let Some(cached) = self.cached(&body) {
+            return Ok(cached);
         }
-        for message in history {
-            messages.push(LlmMessage {
-                role: message.role.as_str().to_string(),
-                content: message.content.clone(),
-            });
+        let response = self.send(&body).await?;
+
+        let reply: LlmResponse = response
+            .json()
+            .await
+            .map_err(|err| EngineError::LlmRequest(err.to_string()))?;
+
+        if let Some(content) = reply.content() {
+            let content = content.to_string();
+            if let Some(cache) = &self.cache {
+                lock_cache(cache).insert(body, content.clone());
+            }
+            return Ok(content);
         }
 
-        let payload = LlmRequest {
-            model: self.model.clone(),
-            messages,
-            stream: false,
+        Err(EngineError::InvalidResponse(
+            "missing LLM response content".to_string(),
+        ))
+    }
+
+    /// Requests a streamed reply and yields its text deltas as they arrive.
+    /// Accepts OpenAI-style SSE (`data: {...}`) as well as Ollama's
+    /// newline-delimited JSON.
+    async fn call_stream(&self, history: &[ChatMessage]) -> Result<LlmTextStream, EngineError> {
+        let body = self.encode_request(history, true)?;
+        if let Some(cached) = self.cached(&body) {
+            let reply: Result<String, EngineError> = Ok(cached);
+            return Ok(Box::pin(futures_util::stream::iter([reply])));
+        }
+        let response = self.send(&body).await?;
+        let state = LlmStreamState {
+            body: Box::pin(response.bytes_stream()),
+            buffer: Vec::new(),
+            text: String::new(),
+            eof: false,
+            done: false,
+            cache: self.cache.clone().map(|cache| (cache, body)),
         };
+        Ok(Box::pin(futures_util::stream::unfold(
+            state,
+            LlmStreamState::next_delta,
+        )))
+    }
 
-        let response = send_with_retry(|| {
-            self.client
-                .post(&self.api_url)
-                .header(CONTENT_TYPE, "application/json")
-                .json(&payload)
-        })
-        .await
-        .map_err(|err| EngineError::LlmRequest(err.to_string()))?;
+    fn encode_request(&self, history: &[ChatMessage], stream: bool) -> Result<Bytes, EngineError> {
+        let system_prompt = self.system_prompt.as_deref();
+        let payload = LlmRequest {
+            model: &self.model,
+            messages: LlmMessages {
+                system_prompt,
+                history,
+            },
+            stream,
+        };
 
-        let response = response
-            .error_for_status()
+        // Size the body from the message text up front so encoding a long
+        // session does not keep regrowing it.
+        let text_len = system_prompt.map_or(0, str::len)
+            + history
+                .iter()
+                .map(|message| message.content.len() + LLM_MESSAGE_OVERHEAD)
+                .sum::<usize>();
+        let mut body = Vec::with_capacity(text_len + LLM_MESSAGE_OVERHEAD + self.model.len());
+        // Encode once; retries resend the same bytes.
+        serde_json::to_writer(&mut body, &payload)
             .map_err(|err| EngineError::LlmRequest(err.to_string()))?;
+        Ok(Bytes::from(body))
+    }
 
-        let body: LlmResponse = response
-            .json()
+    /// The encoded body covers the model, system prompt, history and stream
+    /// flag, so it is an exact cache key.
+    fn cached(&self, body: &Bytes) -> Option<String> {
+        let cached = lock_cache(self.cache.as_ref()?).get(body)?;
+        tracing::debug!("llm cache hit");
+        Some(cached)
+    }
+
+    async fn send(&self, body: &Bytes) -> Result<reqwest::Response, EngineError> {
+        let response = send_with_retry(|| self.client.post(&self.api_url).body(body.clone()))
             .await
             .map_err(|err| EngineError::LlmRequest(err.to_string()))?;
 
-        if let Some(content) = body.content() {
-            return Ok(content.to_string());
+        response
+            .error_for_status()
+            .map_err(|err| EngineError::LlmRequest(err.to_string()))
+    }
+}
+
+type LlmTextStream = Pin<Box<dyn Stream<Item = Result<String, EngineError>> + Send>>;
+
+struct LlmStreamState {
+    body: Pin<Box<dyn Stream<Item = reqwest::Result<Bytes>> + Send>>,
+    /// Received bytes not yet split into lines.
+    buffer: Vec<u8>,
+    /// The reply so far, stored in the cache once the stream completes.
+    text: String,
+    eof: bool,
+    done: bool,
+    cache: Option<(Arc<Mutex<LlmCache>>, Bytes)>,
+}
+
+impl LlmStreamState {
+    async fn next_delta(mut self) -> Option<(Result<String, EngineError>, Self)> {
+        loop {
+            if self.done {
+                return None;
+            }
+            let Some(end) = self.buffer.iter().position(|byte| *byte == b'\n') else {
+                if self.eof {
+                    self.complete();
+                    return None;
+                }
+                match self.body.next().await {
+                    Some(Ok(chunk)) => self.buffer.extend_from_slice(&chunk),
+                    Some(Err(err)) => {
+                        self.done = true;
+                        return Some((Err(EngineError::LlmRequest(err.to_string())), self));
+                    }
+                    None => {
+                        // Treat an unterminated last line as complete.
+                        self.eof = true;
+                        if !self.buffer.is_empty() {
+                            self.buffer.push(b'\n');
+                        }
+                    }
+                }
+                continue;
+            };
+
+            let line = parse_stream_line(&self.buffer[..end]);
+            self.buffer.drain(..=end);
+            match line {
+                Ok(StreamLine::Delta(delta)) => {
+                    self.text.push_str(&delta);
+                    return Some((Ok(delta), self));
+                }
+                Ok(StreamLine::Done) => {
+                    self.complete();
+                    return None;
+                }
+                Ok(StreamLine::Skip) => {}
+                Err(err) => {
+                    self.done = true;
+                    return Some((Err(err), self));
+                }
+            }
         }
+    }
 
-        Err(EngineError::InvalidResponse(
-            "missing LLM response content".to_string(),
-        ))
+    fn complete(&mut self) {
+        self.done = true;
+        if let Some((cache, body)) = self.cache.take() {
+            if !self.text.is_empty() {
+                lock_cache(&cache).insert(body, std::mem::take(&mut self.text));
+            }
+        }
+    }
+}
+
+enum StreamLine {
+    Delta(String),
+    Done,
+    Skip,
+}
+
+fn parse_stream_line(line: &[u8]) -> Result<StreamLine, EngineError> {
+    let line = line.trim_ascii();
+    let json = match line.strip_prefix(b"data:") {
+        Some(data) => data.trim_ascii(),
+        None => line,
+    };
+    if json == b"[DONE]" {
+        return Ok(StreamLine::Done);
+    }
+    // Blank keep-alive lines, SSE comments and other SSE fields.
+    if !json.starts_with(b"{") {
+        return Ok(StreamLine::Skip);
+    }
+
+    let chunk: LlmStreamChunk = serde_json::from_slice(json)
+        .map_err(|err| EngineError::InvalidResponse(err.to_string()))?;
+    match chunk.content() {
+        Some(content) if !content.is_empty() => Ok(StreamLine::Delta(content.to_string())),
+        _ if chunk.done == Some(true) => Ok(StreamLine::Done),
+        _ => Ok(StreamLine::Skip),
+    }
+}
+
+/// Small LRU of LLM replies keyed by the exact request body, most recently
+/// used first. Linear scans are fine at the handful of entries this holds.
+struct LlmCache {
+    capacity: usize,
+    entries: VecDeque<(Bytes, String)>,
+}
+
+impl LlmCache {
+    fn new(capacity: usize) -> Self {
+        Self {
+            capacity,
+            entries: VecDeque::with_capacity(capacity),
+        }
+    }
+
+    fn get(&mut self, key: &Bytes) -> Option<String> {
+        let index = self.entries.iter().position(|(entry, _)| entry == key)?;
+        let entry = self.entries.remove(index)?;
+        let reply = entry.1.clone();
+        self.entries.push_front(entry);
+        Some(reply)
     }
+
+    fn insert(&mut self, key: Bytes, reply: String) {
+        if let Some(index) = self.entries.iter().position(|(entry, _)| *entry == key) {
+            self.entries.remove(index);
+        }
+        if self.entries.len() >= self.capacity {
+            self.entries.pop_back();
+        }
+        self.entries.push_front((key, reply));
+    }
+}
+
+fn lock_cache(cache: &Mutex<LlmCache>) -> std::sync::MutexGuard<'_, LlmCache> {
+    cache
+        .lock()
+        .unwrap_or_else(|poisoned| poisoned.into_inner())
 }
 
 #[derive(Clone)]
 struct VibevoiceClient {
-    ws_url: String,
-    cfg_scale: Option<f32>,
-    inference_steps: Option<u32>,
-    voice: Option<String>,
+    /// The websocket URL with the fixed synthesis parameters already applied;
+    /// each request only appends its text. A parse error is reported per request.
+    base_url: Result<Url, url::ParseError>,
     connect_timeout: Duration,
     sample_rate: u32,
     channels: u16,
@@ -197,10 +396,7 @@ struct VibevoiceClient {
 impl VibevoiceClient {
     fn new(config: &LocalEngineConfig) -> Self {
         Self {
-            ws_url: config.vibevoice_ws_url.clone(),
-            cfg_scale: config.vibevoice_cfg_scale,
-            inference_steps: config.vibevoice_inference_steps,
-            voice: config.vibevoice_voice.clone(),
+            base_url: vibevoice_base_url(config),
             connect_timeout: config.vibevoice_connect_timeout,
             sample_rate: config.vibevoice_sample_rate,
             channels: config.vibevoice_channels,
@@ -217,7 +413,8 @@ impl VibevoiceClient {
             .build_url(trimmed)
             .map_err(|err| EngineError::Vibevoice(err.to_string()))?;
 
-        let connect = tokio_tungstenite::connect_async(url.as_str());
+        // Audio arrives as many small frames; don't let Nagle hold them back.
+        let connect = tokio_tungstenite::connect_async_with_config(url.as_str(), None, true);
         let (stream, _response) = tokio::time::timeout(self.connect_timeout, connect)
             .await
             .map_err(|_| EngineError::Vibevoice("connection timeout".to_string()))?
@@ -255,29 +452,45 @@ impl VibevoiceClient {
         })
     }
 
+    /// Starts synthesizing a streamed sentence in the background; an LLM error
+    /// in its place is handed through as the result.
+    fn spawn_synthesis(
+        &self,
+        sentence: Result<String, EngineError>,
+    ) -> JoinHandle<Result<AudioStream, EngineError>> {
+        let client = self.clone();
+        tokio::spawn(async move { client.synthesize_stream(&sentence?).await })
+    }
+
     fn build_url(&self, text: &str) -> Result<Url, url::ParseError> {
-        let mut url = Url::parse(&self.ws_url)?;
-        {
-            let mut pairs = url.query_pairs_mut();
-            pairs.append_pair("text", text);
-            if let Some(cfg) = self.cfg_scale {
-                pairs.append_pair("cfg", &cfg.to_string());
-            }
-            if let Some(steps) = self.inference_steps {
-                pairs.append_pair("steps", &steps.to_string());
-            }
-            if let Some(voice) = &self.voice {
-                pairs.append_pair("voice", voice);
-            }
-        }
+        let mut url = self.base_url.clone()?;
+        url.query_pairs_mut().append_pair("text", text);
         Ok(url)
     }
 }
 
+fn vibevoice_base_url(config: &LocalEngineConfig) -> Result<Url, url::ParseError> {
+    let mut url = Url::parse(&config.vibevoice_ws_url)?;
+    {
+        let mut pairs = url.query_pairs_mut();
+        if let Some(cfg) = config.vibevoice_cfg_scale {
+            pairs.append_pair("cfg", &cfg.to_string());
+        }
+        if let Some(steps) = config.vibevoice_inference_steps {
+            pairs.append_pair("steps", &steps.to_string());
+        }
+        if let Some(voice) = &config.vibevoice_voice {
+            pairs.append_pair("voice", voice);
+        }
+    }
+    Ok(url)
+}
+
 pub struct LocalEngine {
     llm: LlmClient,
     vibevoice: VibevoiceClient,
     stream_audio: bool,
+    llm_stream: bool,
 }
 
 impl LocalEngine {
@@ -286,6 +499,116 @@ impl LocalEngine {
             llm: LlmClient::new(&config)?,
             vibevoice: VibevoiceClient::new(&config),
             stream_audio: config.stream_audio,
+            llm_stream: config.llm_stream,
+        })
+    }
+
+    /// Speaks the reply while the LLM is still generating it: one task turns
+    /// text deltas into sentences and another synthesizes them in order into a
+    /// single audio stream. Returns once the first sentence is being
+    /// synthesized, so startup errors still fail the request.
+    async fn process_streaming(
+        &self,
+        history: &[ChatMessage],
+    ) -> Result<EngineResponse, EngineError> {
+        let mut deltas = self.llm.call_stream(history).await?;
+        // Unbounded so the LLM body is read at network speed rather than at
+        // playback speed, which would run into the client's total timeout.
+        let (sentence_tx, mut sentence_rx) =
+            mpsc::unbounded_channel::<Result<String, EngineError>>();
+        let (text_tx, text_rx) = oneshot::channel();
+        tokio::spawn(async move {
+            let mut splitter = VoiceSentenceSplitter::default();
+            let mut sentences = Vec::new();
+            // Reading goes on after playback stops so the session still gets
+            // the reply; it ends early only on an LLM error, with the partial text.
+            while let Some(delta) = deltas.next().await {
+                match delta {
+                    Ok(delta) => splitter.push(&delta, &mut sentences),
+                    Err(err) => {
+                        let _ = sentence_tx.send(Err(err));
+                        break;
+                    }
+                }
+                for sentence in sentences.drain(..) {
+                    let _ = sentence_tx.send(Ok(sentence));
+                }
+            }
+            let text = splitter.finish(&mut sentences);
+            for sentence in sentences {
+                let _ = sentence_tx.send(Ok(sentence));
+            }
+            let _ = text_tx.send(text);
+        });
+
+        let first = match sentence_rx.recv().await {
+            Some(sentence) => sentence?,
+            None => return Err(EngineError::Vibevoice("empty voice output".to_string())),
+        };
+        let AudioStream {
+            format,
+            stream: mut audio,
+        } = self.vibevoice.synthesize_stream(&first).await?;
+
+        let (audio_tx, audio_rx) = mpsc::channel::<Result<Bytes, EngineError>>(32);
+        let vibevoice = self.vibevoice.clone();
+        tokio::spawn(async move {
+            // The next sentence is connected while the current one is still
+            // playing, so its handshake and first audio overlap playback.
+            let mut next: Option<JoinHandle<Result<AudioStream, EngineError>>> = None;
+            let mut sentences_open = true;
+            loop {
+                tokio::select! {
+                    chunk = audio.next() => match chunk {
+                        Some(chunk) => {
+                            // The receiver is gone once playback was cancelled.
+                            if audio_tx.send(chunk).await.is_err() {
+                                if let Some(next) = next {
+                                    next.abort();
+                                }
+                                return;
+                            }
+                        }
+                        None => {
+                            let pending = match next.take() {
+                                Some(pending) => pending,
+                                None => match sentence_rx.recv().await {
+                                    Some(sentence) => vibevoice.spawn_synthesis(sentence),
+                                    None => return,
+                                },
+                            };
+                            let synthesized = pending
+                                .await
+                                .unwrap_or_else(|err| Err(EngineError::Vibevoice(err.to_string())));
+                            match synthesized {
+                                Ok(synthesized) => audio = synthesized.stream,
+                                Err(err) => {
+                                    let _ = audio_tx.send(Err(err)).await;
+                                    return;
+                                }
+                            }
+                        }
+                    },
+                    sentence = sentence_rx.recv(), if sentences_open && next.is_none() => {
+                        match sentence {
+                            Some(sentence) => next = Some(vibevoice.spawn_synthesis(sentence)),
+                            None => sentences_open = false,
+                        }
+                    }
+                }
+            }
+        });
+
+        let stream = futures_util::stream::unfold(audio_rx, |mut audio_rx| async move {
+            let chunk = audio_rx.recv().await?;
+            Some((chunk, audio_rx))
+        });
+        Ok(EngineResponse {
+            assistant_text: AssistantText::Pending(text_rx),
+            audio: EngineAudio::Stream(AudioStream {
+                format,
+                stream: Box::pin(stream),
+            }),
         })
     }
 }
@@ -293,13 +616,16 @@ impl LocalEngine {
 #[async_trait]
 impl Engine for LocalEngine {
     async fn process(&self, request: EngineRequest<'_>) -> Result<EngineResponse, EngineError> {
+        if self.stream_audio && self.llm_stream {
+            return self.process_streaming(request.history).await;
+        }
         let response_text = self.llm.call(request.history).await?;
         let voice_text = extract_voice_output(&response_text)
             .unwrap_or_else(|| response_text.trim().to_string());
         let audio = self.vibevoice.synthesize_stream(&voice_text).await?;
         if self.stream_audio {
             Ok(EngineResponse {
-                assistant_text: Some(response_text),
+                assistant_text: AssistantText::Ready(response_text),
                 audio: EngineAudio::Stream(audio),
             })
         } else {
@@ -308,7 +634,12 @@ impl Engine for LocalEngine {
             let mut data: Vec<u8> = Vec::new();
             while let Some(chunk) = stream.next().await {
                 let bytes = chunk?;
-                data.extend_from_slice(&bytes);
+                if data.is_empty() {
+                    // Adopt the first frame's buffer instead of copying it.
+                    data = Vec::from(bytes);
+                } else {
+                    data.extend_from_slice(&bytes);
+                }
             }
 
             let full_audio = match format {
@@ -324,43 +655,199 @@ impl Engine for LocalEngine {
             };
 
             Ok(EngineResponse {
-                assistant_text: Some(response_text),
+                assistant_text: AssistantText::Ready(response_text),
                 audio: EngineAudio::Full(full_audio),
             })
         }
     }
 }
 
+const VOICE_OUTPUT_OPEN: &str = "[VOICE OUTPUT]";
+const VOICE_OUTPUT_CLOSE: &str = "[/VOICE OUTPUT]";
+
+/// Joins the non-empty `[VOICE OUTPUT]...[/VOICE OUTPUT]` segments (tags
+/// matched case-insensitively) in a single pass over `text`. An unclosed final
+/// segment runs to the end of the text, as it does when the reply is streamed.
 fn extract_voice_output(text: &str) -> Option<String> {
-    static VOICE_OUTPUT_RE: OnceLock<Regex> = OnceLock::new();
-    let regex = VOICE_OUTPUT_RE
-        .get_or_init(|| Regex::new(r"(?is)\[VOICE OUTPUT\](.*?)\[/VOICE OUTPUT\]").unwrap());
+    let mut output: Option<String> = None;
+    let mut rest = text;
+    while let Some(open) = find_ignore_ascii_case(rest, VOICE_OUTPUT_OPEN) {
+        let body = &rest[open + VOICE_OUTPUT_OPEN.len()..];
+        let close = find_ignore_ascii_case(body, VOICE_OUTPUT_CLOSE);
+        let segment = body[..close.unwrap_or(body.len())].trim();
+        if !segment.is_empty() {
+            match output.as_mut() {
+                Some(joined) => {
+                    joined.push(' ');
+                    joined.push_str(segment);
+                }
+                None => output = Some(segment.to_string()),
+            }
+        }
+        let Some(close) = close else {
+            break;
+        };
+        rest = &body[close + VOICE_OUTPUT_CLOSE.len()..];
+    }
+    output
+}
 
-    let segments: Vec<String> = regex
-        .captures_iter(text)
-        .filter_map(|cap| cap.get(1))
-        .map(|m| m.as_str().trim().to_string())
-        .filter(|segment| !segment.is_empty())
-        .collect();
+/// Splits a streamed reply into sentences to speak as it arrives, speaking
+/// what `extract_voice_output` would: its `[VOICE OUTPUT]` segments, or the
+/// whole reply when that finds nothing. Untagged text is held until the reply
+/// ends since a tag may still follow.
+#[derive(Default)]
+struct VoiceSentenceSplitter {
+    text: String,
+    /// Bytes of `text` already scanned for tags.
+    scanned: usize,
+    in_voice: bool,
+    tagged: bool,
+    /// The unfinished sentence of the current voice segment.
+    sentence: String,
+}
 
-    if segments.is_empty() {
-        None
-    } else {
-        Some(segments.join(" "))
+impl VoiceSentenceSplitter {
+    fn push(&mut self, delta: &str, sentences: &mut Vec<String>) {
+        self.text.push_str(delta);
+        loop {
+            let rest = &self.text[self.scanned..];
+            let tag = if self.in_voice {
+                VOICE_OUTPUT_CLOSE
+            } else {
+                VOICE_OUTPUT_OPEN
+            };
+            let Some(index) = find_ignore_ascii_case(rest, tag) else {
+                // A tag may be split across deltas; leave its start unscanned.
+                let end = rest.len() - partial_tag_len(rest, tag);
+                if self.in_voice {
+                    self.sentence.push_str(&rest[..end]);
+                    take_sentences(&mut self.sentence, sentences);
+                }
+                self.scanned += end;
+                return;
+            };
+            if self.in_voice {
+                self.sentence.push_str(&rest[..index]);
+                take_sentences(&mut self.sentence, sentences);
+                push_sentence(&self.sentence, sentences);
+                self.sentence.clear();
+            }
+            self.scanned += index + tag.len();
+            self.in_voice = !self.in_voice;
+            self.tagged = true;
+        }
+    }
+
+    /// Adds whatever is left to speak and returns the full reply.
+    fn finish(mut self, sentences: &mut Vec<String>) -> String {
+        if !self.tagged || extract_voice_output(&self.text).is_none() {
+            // Nothing tagged was spoken, so the whole reply is.
+            self.sentence = self.text.clone();
+        } else if self.in_voice {
+            self.sentence.push_str(&self.text[self.scanned..]);
+        }
+        take_sentences(&mut self.sentence, sentences);
+        push_sentence(&self.sentence, sentences);
+        self.text
+    }
+}
+
+/// Moves every complete sentence out of `buffer`, leaving the unfinished tail.
+fn take_sentences(buffer: &mut String, sentences: &mut Vec<String>) {
+    let bytes = buffer.as_bytes();
+    let mut start = 0;
+    for index in 1..bytes.len() {
+        if bytes[index].is_ascii_whitespace() && matches!(bytes[index - 1], b'.' | b'!' | b'?') {
+            push_sentence(&buffer[start..index], sentences);
+            start = index;
+        }
+    }
+    buffer.drain(..start);
+}
+
+fn push_sentence(text: &str, sentences: &mut Vec<String>) {
+    let trimmed = text.trim();
+    if !trimmed.is_empty() {
+        sentences.push(trimmed.to_string());
     }
 }
 
+/// Length of the longest suffix of `text` that could be the start of `tag`.
+fn partial_tag_len(text: &str, tag: &str) -> usize {
+    match text.rfind('[') {
+        Some(start) => {
+            let suffix = &text.as_bytes()[start..];
+            if suffix.len() < tag.len()
+                && suffix.eq_ignore_ascii_case(&tag.as_bytes()[..suffix.len()])
+            {
+                suffix.len()
+            } else {
+                0
+            }
+        }
+        None => 0,
+    }
+}
+
+// `needle` is ASCII, so any match starts and ends on a char boundary. Jumps
+// between occurrences of the needle's first byte (`[` for the voice tags)
+// and only compares the rest there, instead of testing every window.
+fn find_ignore_ascii_case(haystack: &str, needle: &str) -> Option<usize> {
+    let haystack = haystack.as_bytes();
+    let (first, tail) = needle.as_bytes().split_first()?;
+    let last_start = haystack.len().checked_sub(needle.len())?;
+    let mut start = 0;
+    while start <= last_start {
+        let index = start
+            + haystack[start..=last_start]
+                .iter()
+                .position(|byte| byte.eq_ignore_ascii_case(first))?;
+        if haystack[index + 1..index + needle.len()].eq_ignore_ascii_case(tail) {
+            return Some(index);
+        }
+        start = index + 1;
+    }
+    None
+}
+
+/// Rough encoded size of one message besides its content: the role and the
+/// JSON punctuation around both fields.
+const LLM_MESSAGE_OVERHEAD: usize = 40;
+
 #[derive(Debug, Serialize)]
-struct LlmRequest {
-    model: String,
-    messages: Vec<LlmMessage>,
+struct LlmRequest<'a> {
+    model: &'a str,
+    messages: LlmMessages<'a>,
     stream: bool,
 }
 
+/// The system prompt followed by the session history, encoded as the
+/// `messages` array directly from the session without collecting them first.
+#[derive(Debug)]
+struct LlmMessages<'a> {
+    system_prompt: Option<&'a str>,
+    history: &'a [ChatMessage],
+}
+
+impl Serialize for LlmMessages<'_> {
+    fn serialize<S: Serializer>(&self, serializer: S) -> Result<S::Ok, S::Error> {
+        let system = self.system_prompt.map(|content| LlmMessage {
+            role: "system",
+            content,
+        });
+        let history = self.history.iter().map(|message| LlmMessage {
+            role: message.role.as_str(),
+            content: &message.content,
+        });
+        serializer.collect_seq(system.into_iter().chain(history))
+    }
+}
+
 #[derive(Debug, Serialize)]
-struct LlmMessage {
-    role: String,
-    content: String,
+struct LlmMessage<'a> {
+    role: &'a str,
+    content: &'a str,
 }
 
 #[derive(Debug, Deserialize)]
@@ -380,6 +867,29 @@ impl LlmResponse {
     }
 }
 
+#[derive(Debug, Deserialize)]
+struct LlmStreamChunk {
+    choices: Option<Vec<LlmStreamChoice>>,
+    message: Option<LlmAssistantMessage>,
+    done: Option<bool>,
+}
+
+impl LlmStreamChunk {
+    fn content(&self) -> Option<&str> {
+        if let Some(choices) = &self.choices {
+            return choices
+                .iter()
+                .find_map(|choice| choice.delta.content.as_deref());
+        }
+        self.message.as_ref()?.content.as_deref()
+    }
+}
+
+#[derive(Debug, Deserialize)]
+struct LlmStreamChoice {
+    delta: LlmAssistantMessage,
+}
+
 #[derive(Debug, Deserialize)]
 struct LlmChoice {
     message: LlmAssistantMessage,
@@ -392,7 +902,11 @@ struct LlmAssistantMessage {
 
 #[cfg(test)]
 mod tests {
-    use super::extract_voice_output;
+    use bytes::Bytes;
+
+    use super::{
+        extract_voice_output, parse_stream_line, LlmCache, StreamLine, VoiceSentenceSplitter,
+    };
 
     #[test]
     fn extracts_voice_output_segments() {
@@ -413,4 +927,103 @@ mod tests {
         let output = extract_voice_output(input);
         assert_eq!(output.as_deref(), Some("Hello"));
     }
+
+    #[test]
+    fn llm_cache_evicts_least_recently_used() {
+        let mut cache = LlmCache::new(2);
+        cache.insert(Bytes::from_static(b"a"), "A".to_string());
+        cache.insert(Bytes::from_static(b"b"), "B".to_string());
+        assert_eq!(cache.get(&Bytes::from_static(b"a")).as_deref(), Some("A"));
+        cache.insert(Bytes::from_static(b"c"), "C".to_string());
+        assert!(cache.get(&Bytes::from_static(b"b")).is_none());
+        assert_eq!(cache.get(&Bytes::from_static(b"a")).as_deref(), Some("A"));
+        assert_eq!(cache.get(&Bytes::from_static(b"c")).as_deref(), Some("C"));
+    }
+
+    #[test]
+    fn splits_streamed_voice_output_into_sentences() {
+        let mut splitter = VoiceSentenceSplitter::default();
+        let mut sentences = Vec::new();
+        for delta in [
+            "[MEMORY]x[/MEMORY] [VOI",
+            "CE OUTPUT]Hello there! How",
+            " are you?",
+            " Fine[/VOICE",
+            " OUTPUT] bye",
+        ] {
+            splitter.push(delta, &mut sentences);
+        }
+        assert_eq!(sentences, ["Hello there!", "How are you?", "Fine"]);
+        let text = splitter.finish(&mut sentences);
+        assert_eq!(sentences.len(), 3);
+        assert_eq!(
+            extract_voice_output(&text).as_deref(),
+            Some("Hello there! How are you? Fine")
+        );
+    }
+
+    #[test]
+    fn speaks_untagged_stream_when_it_ends() {
+        let mut splitter = VoiceSentenceSplitter::default();
+        let mut sentences = Vec::new();
+        splitter.push("Hi. I am ", &mut sentences);
+        splitter.push("Alice.", &mut sentences);
+        assert!(sentences.is_empty());
+        let text = splitter.finish(&mut sentences);
+        assert_eq!(text, "Hi. I am Alice.");
+        assert_eq!(sentences, ["Hi.", "I am Alice."]);
+    }
+
+    #[test]
+    fn speaks_whole_stream_when_voice_segments_are_empty() {
+        let mut splitter = VoiceSentenceSplitter::default();
+        let mut sentences = Vec::new();
+        splitter.push("[VOICE OUTPUT] [/VOICE OUTPUT]", &mut sentences);
+        splitter.push(" Sure thing. ", &mut sentences);
+        assert!(sentences.is_empty());
+        let text = splitter.finish(&mut sentences);
+        assert_eq!(extract_voice_output(&text), None);
+        assert_eq!(sentences, [text.trim()]);
+    }
+
+    #[test]
+    fn parses_sse_and_ndjson_stream_lines() {
+        let sse = br#"data: {"choices":[{"delta":{"content":"Hi"}}]}"#;
+        assert!(matches!(parse_stream_line(sse), Ok(StreamLine::Delta(text)) if text == "Hi"));
+        assert!(matches!(
+            parse_stream_line(b"data: [DONE]"),
+            Ok(StreamLine::Done)
+        ));
+        assert!(matches!(
+            parse_stream_line(b": keep-alive"),
+            Ok(StreamLine::Skip)
+        ));
+        let ndjson = br#"{"message":{"content":""},"done":true}"#;
+        assert!(matches!(parse_stream_line(ndjson), Ok(StreamLine::Done)));
+    }
+
+    #[test]
+    fn matches_tags_case_insensitively() {
+        let input = "[voice output]\nHéllo\n[/Voice Output] [Voice Output]Bye[/VOICE OUTPUT]";
+        let output = extract_voice_output(input);
+        assert_eq!(output.as_deref(), Some("Héllo Bye"));
+    }
+
+    #[test]
+    fn speaks_unclosed_final_voice_segment() {
+        let mut splitter = VoiceSentenceSplitter::default();
+        let mut sentences = Vec::new();
+        splitter.push(
+            "[VOICE OUTPUT]Hi![/VOICE OUTPUT] [voice output]Sure. ",
+            &mut sentences,
+        );
+        splitter.push("Let me check", &mut sentences);
+        assert_eq!(sentences, ["Hi!", "Sure."]);
+        let text = splitter.finish(&mut sentences);
+        assert_eq!(sentences, ["Hi!", "Sure.", "Let me check"]);
+        assert_eq!(
+            extract_voice_output(&text).as_deref(),
+            Some("Hi! Sure. Let me check")
+        );
+    }
 }
@@ -1,11 +1,13 @@
 use std::env;
 use std::pin::Pin;
-use std::sync::Arc;
+use std::sync::{Arc, OnceLock};
 use std::time::Duration;
 
 use async_trait::async_trait;
 use bytes::Bytes;
 use futures_util::Stream;
+use reqwest::header::HeaderMap;
+use tokio::sync::oneshot;
 use tokio::time::sleep;
 use tracing::{info, warn};
 
@@ -17,10 +19,29 @@ mod session;
 
 pub use cloud::{CloudEngine, CloudEngineConfig};
 pub use local::{LocalEngine, LocalEngineConfig};
-pub use session::{ChatMessage, SessionManager};
+pub use session::{AssistantSlot, ChatMessage, SessionManager};
 
 const MAX_RETRY_ATTEMPTS: usize = 5;
 const RETRY_BACKOFF_BASE_MS: u64 = 200;
+// Keep the connection to the LLM / cloud backend warm between turns so each
+// utterance does not pay a fresh TCP (and TLS) handshake.
+const HTTP_POOL_IDLE_TIMEOUT: Duration = Duration::from_secs(300);
+const HTTP_POOL_MAX_IDLE_PER_HOST: usize = 4;
+const HTTP_TCP_KEEPALIVE: Duration = Duration::from_secs(30);
+const HTTP_USER_AGENT: &str = "BookOfBooks/1.0";
+
+/// `default_headers` holds the headers that never change between requests,
+/// so they are built once per client rather than on every send.
+fn http_client_builder(timeout: Duration, default_headers: HeaderMap) -> reqwest::ClientBuilder {
+    reqwest::Client::builder()
+        .timeout(timeout)
+        .user_agent(HTTP_USER_AGENT)
+        .default_headers(default_headers)
+        .pool_idle_timeout(HTTP_POOL_IDLE_TIMEOUT)
+        .pool_max_idle_per_host(HTTP_POOL_MAX_IDLE_PER_HOST)
+        .tcp_keepalive(HTTP_TCP_KEEPALIVE)
+        .tcp_nodelay(true)
+}
 
 fn retry_backoff_duration(attempt: usize) -> Duration {
     let factor = 1u64 << attempt.saturating_sub(1);
@@ -58,10 +79,14 @@ fn curl_equivalent(request: &reqwest::Request) -> String {
     parts.join(" ")
 }
 
+/// DEBUG_URLS is read once; the environment does not change at runtime.
 fn debug_urls_enabled() -> bool {
-    env::var("DEBUG_URLS")
-        .map(|value| value.trim() == "1")
-        .unwrap_or(false)
+    static DEBUG_URLS: OnceLock<bool> = OnceLock::new();
+    *DEBUG_URLS.get_or_init(|| {
+        env::var("DEBUG_URLS")
+            .map(|value| value.trim() == "1")
+            .unwrap_or(false)
+    })
 }
 
 pub(crate) async fn send_with_retry<F>(mut build: F) -> Result<reqwest::Response, reqwest::Error>
@@ -104,10 +129,21 @@ pub struct EngineRequest<'a> {
 
 #[derive(Debug)]
 pub struct EngineResponse {
-    pub assistant_text: Option<String>,
+    pub assistant_text: AssistantText,
     pub audio: EngineAudio,
 }
 
+#[derive(Debug)]
+pub enum AssistantText {
+    /// The full reply, known when the response is returned.
+    Ready(String),
+    /// The reply is still streaming from the LLM alongside the audio; the
+    /// receiver resolves once it completes and is dropped if it fails.
+    Pending(oneshot::Receiver<String>),
+    /// The provider only returns audio.
+    Unavailable,
+}
+
 pub struct AudioStream {
     pub format: AudioStreamFormat,
     pub stream: Pin<Box<dyn Stream<Item = Result<Bytes, EngineError>> + Send>>,
@@ -192,6 +228,17 @@ fn env_optional_string(key: &str) -> Option<String> {
         })
 }
 
+fn env_bool(key: &str, default: bool) -> bool {
+    match env::var(key) {
+        Ok(value) => match value.trim().to_ascii_lowercase().as_str() {
+            "1" | "true" | "yes" | "on" => true,
+            "0" | "false" | "no" | "off" => false,
+            _ => default,
+        },
+        Err(_) => default,
+    }
+}
+
 fn env_optional_f32(key: &str) -> Option<f32> {
     env::var(key).ok().and_then(|value| value.parse::<f32>().ok())
 }
@@ -1,3 +1,4 @@
+use std::sync::Arc;
 use std::time::{Duration, Instant};
 
 use uuid::Uuid;
@@ -21,14 +22,16 @@ impl ChatRole {
     }
 }
 
+/// `content` is shared, so snapshotting the history for a request copies
+/// pointers rather than every message of the session.
 #[derive(Debug, Clone, PartialEq, Eq)]
 pub struct ChatMessage {
     pub role: ChatRole,
-    pub content: String,
+    pub content: Arc<str>,
 }
 
 impl ChatMessage {
-    pub fn new(role: ChatRole, content: impl Into<String>) -> Self {
+    pub fn new(role: ChatRole, content: impl Into<Arc<str>>) -> Self {
         Self {
             role,
             content: content.into(),
@@ -36,6 +39,14 @@ impl ChatMessage {
     }
 }
 
+/// Place in the history held for an assistant reply whose text is still
+/// being generated. Only fills the session it was reserved in.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct AssistantSlot {
+    session_id: String,
+    index: usize,
+}
+
 #[derive(Debug, Clone)]
 pub struct SessionManager {
     id: String,
@@ -66,11 +77,12 @@ impl SessionManager {
         &self.history
     }
 
-    pub fn add_user_message(&mut self, text: impl Into<String>) {
+    #[allow(dead_code)]
+    pub fn add_user_message(&mut self, text: impl Into<Arc<str>>) {
         self.add_user_message_at(text, Instant::now());
     }
 
-    pub fn add_assistant_message(&mut self, text: impl Into<String>) {
+    pub fn add_assistant_message(&mut self, text: impl Into<Arc<str>>) {
         self.add_assistant_message_at(text, Instant::now());
     }
 
@@ -78,18 +90,49 @@ impl SessionManager {
         self.add_assistant_message(CLOUD_MESSAGE_PLACEHOLDER);
     }
 
-    pub fn add_user_message_at(&mut self, text: impl Into<String>, now: Instant) {
+    /// Records an empty reply now, so the reply keeps its place ahead of any
+    /// user turn that arrives before its text does.
+    pub fn reserve_assistant_message(&mut self) -> AssistantSlot {
+        self.add_assistant_message("");
+        AssistantSlot {
+            session_id: self.id.clone(),
+            index: self.history.len() - 1,
+        }
+    }
+
+    /// Replaces a reserved reply with its text. Returns false when
+    /// the slot belongs to an earlier session.
+    pub fn fill_assistant_message(
+        &mut self,
+        slot: &AssistantSlot,
+        text: impl Into<Arc<str>>,
+    ) -> bool {
+        if slot.session_id != self.id {
+            return false;
+        }
+        match self.history.get_mut(slot.index) {
+            Some(message) if message.role == ChatRole::Assistant => {
+                message.content = text.into();
+                self.last_message_at = Some(Instant::now());
+                true
+            }
+            _ => false,
+        }
+    }
+
+    pub fn add_user_message_at(&mut self, text: impl Into<Arc<str>>, now: Instant) {
         self.history
             .push(ChatMessage::new(ChatRole::User, text));
         self.last_message_at = Some(now);
     }
 
-    pub fn add_assistant_message_at(&mut self, text: impl Into<String>, now: Instant) {
+    pub fn add_assistant_message_at(&mut self, text: impl Into<Arc<str>>, now: Instant) {
         self.history
             .push(ChatMessage::new(ChatRole::Assistant, text));
         self.last_message_at = Some(now);
     }
 
+    #[allow(dead_code)]
     pub fn maybe_rollover(&mut self, timeout: Duration) -> bool {
         self.maybe_rollover_at(Instant::now(), timeout)
     }
@@ -146,7 +189,36 @@ mod tests {
         let mut session = SessionManager::new();
         session.add_assistant_placeholder();
         assert_eq!(session.history().len(), 1);
-        assert_eq!(session.history()[0].content, CLOUD_MESSAGE_PLACEHOLDER);
+        assert_eq!(&*session.history()[0].content, CLOUD_MESSAGE_PLACEHOLDER);
+    }
+
+    #[test]
+    fn session_fills_reserved_reply_in_place() {
+        let mut session = SessionManager::new();
+        session.add_user_message("first");
+        let slot = session.reserve_assistant_message();
+        assert_eq!(&*session.history()[1].content, "");
+        session.add_user_message("second");
+        assert!(session.fill_assistant_message(&slot, "first reply"));
+        let contents: Vec<&str> = session
+            .history()
+            .iter()
+            .map(|message| &*message.content)
+            .collect();
+        assert_eq!(contents, ["first", "first reply", "second"]);
+        assert_eq!(session.history()[1].role, ChatRole::Assistant);
+    }
+
+    #[test]
+    fn session_drops_reply_reserved_in_previous_session() {
+        let mut session = SessionManager::new();
+        session.add_user_message("hello");
+        let slot = session.reserve_assistant_message();
+        session.start_new();
+        session.add_user_message("fresh");
+        assert!(!session.fill_assistant_message(&slot, "stale reply"));
+        assert_eq!(session.history().len(), 1);
+        assert_eq!(&*session.history()[0].content, "fresh");
     }
 
     #[test]
@@ -7,7 +7,6 @@ mod protocol;
 mod tasks;
 mod watchdog;
 
-use std::io::Read;
 use std::time::Duration;
 
 use clap::Parser;
@@ -17,7 +16,10 @@ use tracing_subscriber::EnvFilter;
 
 use crate::cli::{ClientAction, Command, Cli};
 use crate::config::ServerConfig;
-use crate::protocol::{AudioStreamFormat, ClientCommand, RuntimeState, ServerReply, StatusSnapshot};
+use crate::protocol::{ClientCommand, RuntimeState, ServerReply, StatusSnapshot};
+
+/// Upper bound on client stream commands buffered before a single socket write.
+const STREAM_STAGING_BYTES: usize = 64 * 1024;
 
 #[tokio::main]
 async fn main() -> Result<(), Box<dyn std::error::Error>> {
@@ -41,7 +43,7 @@ async fn main() -> Result<(), Box<dyn std::error::Error>> {
         } => {
             if download_models {
                 let model = std::env::var("SR_WHISPER_MODEL")
-                    .unwrap_or_else(|_| "base.en".to_string());
+                    .unwrap_or_else(|_| "base.en-q8_0".to_string());
                 let vad_path = model_download::default_assets_path("silero_vad.onnx");
                 model_download::ensure_models_with_progress(&model, &vad_path)
                     .await
@@ -148,27 +150,33 @@ async fn run_led_test(pin: u8) -> Result<(), Box<dyn std::error::Error>> {
     println!("Status LED test mode");
     println!("Commands: I=Idle, L=Listening, T=Transcribing, P=Processing, S=Speaking, Q=Quit");
 
-    let mut lines = tokio::io::BufReader::new(tokio::io::stdin()).lines();
+    // Commands are plain ASCII, so match raw bytes instead of decoding each line to a String.
+    let mut stdin = tokio::io::BufReader::new(tokio::io::stdin());
+    let mut line = Vec::new();
     loop {
+        line.clear();
         tokio::select! {
-            line = lines.next_line() => {
-                let line = line?;
-                let Some(line) = line else {
+            read = stdin.read_until(b'\n', &mut line) => {
+                if read? == 0 {
                     break;
-                };
-                let cmd = line.trim();
+                }
+                line.make_ascii_lowercase();
+                let cmd = line.trim_ascii();
                 if cmd.is_empty() {
                     continue;
                 }
-                let state = match cmd.to_ascii_lowercase().as_str() {
-                    "i" | "idle" => Some(RuntimeState::Idle),
-                    "l" | "listening" => Some(RuntimeState::Listening),
-                    "t" | "transcribing" => Some(RuntimeState::Transcribing),
-                    "p" | "processing" => Some(RuntimeState::Processing),
-                    "s" | "speaking" => Some(RuntimeState::Speaking),
-                    "q" | "quit" | "exit" => break,
+                let state = match cmd {
+                    b"i" | b"idle" => Some(RuntimeState::Idle),
+                    b"l" | b"listening" => Some(RuntimeState::Listening),
+                    b"t" | b"transcribing" => Some(RuntimeState::Transcribing),
+                    b"p" | b"processing" => Some(RuntimeState::Processing),
+                    b"s" | b"speaking" => Some(RuntimeState::Speaking),
+                    b"q" | b"quit" | b"exit" => break,
                     _ => {
-                        println!("Unknown command '{}'. Use I/L/P/S or Q to quit.", cmd);
+                        println!(
+                            "Unknown command '{}'. Use I/L/P/S or Q to quit.",
+                            String::from_utf8_lossy(cmd)
+                        );
                         None
                     }
                 };
@@ -223,26 +231,50 @@ async fn send_command(addr: &str, command: ClientCommand) -> Result<ServerReply,
     let mut stream = TcpStream::connect(addr)
         .await
         .map_err(|err| format!("connect failed: {}", err))?;
-
-    let payload = serde_json::to_string(&command)
-        .map_err(|err| format!("serialize failed: {}", err))?;
     stream
-        .write_all(payload.as_bytes())
-        .await
-        .map_err(|err| format!("write failed: {}", err))?;
+        .set_nodelay(true)
+        .map_err(|err| format!("set_nodelay failed: {}", err))?;
+
+    // Encode the command and its delimiter into one buffer so it goes out as a
+    // single write.
+    let mut payload =
+        serde_json::to_vec(&command).map_err(|err| format!("serialize failed: {}", err))?;
+    payload.push(b'\n');
     stream
-        .write_all(b"\n")
+        .write_all(&payload)
         .await
         .map_err(|err| format!("write failed: {}", err))?;
 
-    let mut reader = BufReader::new(stream);
-    let mut line = String::new();
-    reader
-        .read_line(&mut line)
-        .await
-        .map_err(|err| format!("read failed: {}", err))?;
+    ReplyReader::new(stream).next_reply().await
+}
 
-    serde_json::from_str(&line).map_err(|err| format!("invalid reply: {}", err))
+/// Reads newline-delimited `ServerReply`s into one reused byte buffer, decoding
+/// each line straight from bytes.
+struct ReplyReader<R> {
+    reader: BufReader<R>,
+    line: Vec<u8>,
+}
+
+impl<R: tokio::io::AsyncRead + Unpin> ReplyReader<R> {
+    fn new(reader: R) -> Self {
+        Self {
+            reader: BufReader::new(reader),
+            line: Vec::new(),
+        }
+    }
+
+    async fn next_reply(&mut self) -> Result<ServerReply, String> {
+        self.line.clear();
+        let read = self
+            .reader
+            .read_until(b'\n', &mut self.line)
+            .await
+            .map_err(|err| format!("read failed: {}", err))?;
+        if read == 0 {
+            return Err("server closed connection".to_string());
+        }
+        serde_json::from_slice(&self.line).map_err(|err| format!("invalid reply: {}", err))
+    }
 }
 
 async fn send_audio_stream(
@@ -259,73 +291,112 @@ async fn send_audio_stream(
         return Err("delay_after_bytes must be > 0 when delay_ms is set".into());
     }
 
-    let mut file = std::fs::File::open(path)?;
-    let mut data = Vec::new();
-    file.read_to_end(&mut data)?;
+    // Read the whole file up front, sized from its metadata, without blocking
+    // the runtime.
+    let data = tokio::fs::read(path).await?;
 
     let stream = TcpStream::connect(addr).await?;
+    stream.set_nodelay(true)?;
     let (reader, mut writer) = stream.into_split();
-    let mut lines = BufReader::new(reader).lines();
+    let mut replies = ReplyReader::new(reader);
+    let mut staging = Vec::with_capacity(STREAM_STAGING_BYTES);
+    let mut staged = 0usize;
 
-    send_stream_command(
-        &mut writer,
-        &mut lines,
-        ClientCommand::AudioStreamStart {
-            format: AudioStreamFormat::Mp3,
-        },
-    )
-    .await?;
+    stage_stream_line(&mut staging, &mut staged, STREAM_START_MP3_LINE);
 
     let mut sent_bytes = 0usize;
     let mut delayed = false;
     for chunk in data.chunks(chunk_bytes) {
         if delay_after_bytes > 0 && !delayed && sent_bytes >= delay_after_bytes {
+            flush_stream_commands(&mut writer, &mut replies, &mut staging, &mut staged).await?;
             tokio::time::sleep(Duration::from_millis(delay_ms)).await;
             delayed = true;
         }
-        send_stream_command(
-            &mut writer,
-            &mut lines,
-            ClientCommand::AudioStreamChunk {
-                data: chunk.to_vec(),
-            },
-        )
-        .await?;
+        stage_stream_chunk(&mut staging, &mut staged, chunk);
+        if staging.len() >= STREAM_STAGING_BYTES {
+            flush_stream_commands(&mut writer, &mut replies, &mut staging, &mut staged).await?;
+        }
         sent_bytes = sent_bytes.saturating_add(chunk.len());
     }
 
-    send_stream_command(
-        &mut writer,
-        &mut lines,
-        ClientCommand::AudioStreamEnd,
-    )
-    .await?;
+    stage_stream_line(&mut staging, &mut staged, STREAM_END_LINE);
+    flush_stream_commands(&mut writer, &mut replies, &mut staging, &mut staged).await?;
 
     Ok(())
 }
 
-async fn send_stream_command(
+/// Encoded `ClientCommand::AudioStreamStart { format: AudioStreamFormat::Mp3 }`
+/// and `ClientCommand::AudioStreamEnd` lines; neither carries any data.
+const STREAM_START_MP3_LINE: &[u8] =
+    b"{\"type\":\"audio_stream_start\",\"format\":{\"type\":\"mp3\"}}\n";
+const STREAM_END_LINE: &[u8] = b"{\"type\":\"audio_stream_end\"}\n";
+
+/// Appends one pre-encoded, newline-terminated command to the staging buffer.
+fn stage_stream_line(staging: &mut Vec<u8>, staged: &mut usize, line: &[u8]) {
+    staging.extend_from_slice(line);
+    *staged += 1;
+}
+
+/// Appends a `ClientCommand::AudioStreamChunk` line without copying the chunk
+/// into a command or going through serde: the envelope is fixed, and the data
+/// is a JSON array of byte values.
+fn stage_stream_chunk(staging: &mut Vec<u8>, staged: &mut usize, chunk: &[u8]) {
+    const PREFIX: &[u8] = b"{\"type\":\"audio_stream_chunk\",\"data\":[";
+    const SUFFIX: &[u8] = b"]}\n";
+    staging.reserve(PREFIX.len() + chunk.len() * 4 + SUFFIX.len());
+    staging.extend_from_slice(PREFIX);
+    for (index, byte) in chunk.iter().enumerate() {
+        if index > 0 {
+            staging.push(b',');
+        }
+        let (digits, len) = &BYTE_DECIMALS[*byte as usize];
+        staging.extend_from_slice(&digits[..*len as usize]);
+    }
+    staging.extend_from_slice(SUFFIX);
+    *staged += 1;
+}
+
+/// Decimal text of every byte value, so chunk encoding never formats numbers.
+const BYTE_DECIMALS: [([u8; 3], u8); 256] = {
+    let mut table = [([0u8; 3], 0u8); 256];
+    let mut value = 0;
+    while value < 256 {
+        let byte = value as u8;
+        table[value] = if byte >= 100 {
+            ([b'0' + byte / 100, b'0' + byte / 10 % 10, b'0' + byte % 10], 3)
+        } else if byte >= 10 {
+            ([b'0' + byte / 10, b'0' + byte % 10, 0], 2)
+        } else {
+            ([b'0' + byte, 0, 0], 1)
+        };
+        value += 1;
+    }
+    table
+};
+
+/// Writes every staged command in a single call, then consumes one reply per command.
+async fn flush_stream_commands(
     writer: &mut tokio::net::tcp::OwnedWriteHalf,
-    lines: &mut tokio::io::Lines<BufReader<tokio::net::tcp::OwnedReadHalf>>,
-    command: ClientCommand,
-) -> Result<ServerReply, String> {
-    let payload = serde_json::to_string(&command)
-        .map_err(|err| format!("serialize failed: {}", err))?;
-    writer
-        .write_all(payload.as_bytes())
-        .await
-        .map_err(|err| format!("write failed: {}", err))?;
+    replies: &mut ReplyReader<tokio::net::tcp::OwnedReadHalf>,
+    staging: &mut Vec<u8>,
+    staged: &mut usize,
+) -> Result<(), String> {
+    if staging.is_empty() {
+        return Ok(());
+    }
     writer
-        .write_all(b"\n")
+        .write_all(staging)
         .await
         .map_err(|err| format!("write failed: {}", err))?;
+    staging.clear();
 
-    let line = lines
-        .next_line()
-        .await
-        .map_err(|err| format!("read failed: {}", err))?;
-    let line = line.ok_or_else(|| "server closed connection".to_string())?;
-    serde_json::from_str(&line).map_err(|err| format!("invalid reply: {}", err))
+    while *staged > 0 {
+        if let ServerReply::Error { message } = replies.next_reply().await? {
+            return Err(format!("server error: {}", message));
+        }
+        *staged -= 1;
+    }
+    Ok(())
 }
 
 fn parse_env_u8(name: &str) -> Option<u8> {
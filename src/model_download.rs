@@ -1,4 +1,6 @@
+use std::collections::HashSet;
 use std::env;
+use std::ffi::OsString;
 use std::path::{Path, PathBuf};
 use std::time::Duration;
 
@@ -47,6 +49,18 @@ const MODELS: &[ModelSpec] = &[
         filename: "ggml-base.en.bin",
         url: "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-base.en.bin",
     },
+    ModelSpec {
+        filename: "ggml-tiny-q8_0.bin",
+        url: "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-tiny-q8_0.bin",
+    },
+    ModelSpec {
+        filename: "ggml-base-q8_0.bin",
+        url: "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-base-q8_0.bin",
+    },
+    ModelSpec {
+        filename: "ggml-base.en-q8_0.bin",
+        url: "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-base.en-q8_0.bin",
+    },
     ModelSpec {
         filename: "silero_vad.onnx",
         url: "https://raw.githubusercontent.com/Sameam/whisper_rust/main/models/silero_vad.onnx",
@@ -266,31 +280,6 @@ pub async fn ensure_moonshine_model(
     Ok(Some(paths))
 }
 
-pub async fn ensure_silero_vad(model_path: &Path) -> Result<(), String> {
-    if should_skip_downloads() {
-        return Ok(());
-    }
-
-    if model_path.exists() {
-        return Ok(());
-    }
-
-    let filename = match model_path.file_name().and_then(|name| name.to_str()) {
-        Some(value) => value,
-        None => return Ok(()),
-    };
-
-    if filename != "silero_vad.onnx" {
-        return Ok(());
-    }
-
-    if let Some(url) = find_url(filename) {
-        download_model(url, model_path, None).await?;
-    }
-
-    Ok(())
-}
-
 pub async fn ensure_models_with_progress(
     whisper_spec: &str,
     silero_path: &Path,
@@ -653,19 +642,25 @@ pub fn moonshine_paths(
 }
 
 fn sherpa_zipformer_files_exist(paths: &SherpaZipformerPaths) -> bool {
-    if !paths.encoder.exists()
-        || !paths.decoder.exists()
-        || !paths.joiner.exists()
-        || !paths.tokens.exists()
-    {
-        return false;
-    }
-    if let Some(ref vocab) = paths.bpe_vocab {
-        if !vocab.exists() {
-            return false;
+    // List the model directory once instead of stat'ing every required file.
+    let present: HashSet<OsString> = match std::fs::read_dir(&paths.dir) {
+        Ok(entries) => entries
+            .filter_map(|entry| entry.ok())
+            .map(|entry| entry.file_name())
+            .collect(),
+        Err(_) => return false,
+    };
+
+    let mut required = vec![&paths.encoder, &paths.decoder, &paths.joiner, &paths.tokens];
+    required.extend(paths.bpe_vocab.as_ref());
+    required.into_iter().all(|path| {
+        if path.parent() != Some(paths.dir.as_path()) {
+            return path.exists();
         }
-    }
-    true
+        path.file_name()
+            .map(|name| present.contains(name))
+            .unwrap_or(false)
+    })
 }
 
 async fn download_model(
@@ -1,17 +1,20 @@
+use std::borrow::Cow;
 use std::env;
 use std::sync::atomic::{AtomicU64, Ordering};
-use std::sync::Arc;
+use std::sync::{Arc, OnceLock};
 use std::time::{Duration, Instant};
 
+use bytes::Bytes;
 use futures_util::StreamExt;
-use tokio::io::{AsyncBufReadExt, AsyncWriteExt, BufReader};
+use serde::Deserialize;
+use tokio::io::{AsyncBufReadExt, AsyncWriteExt, BufReader, BufWriter};
 use tokio::net::{TcpListener, TcpStream};
 use tokio::sync::{broadcast, mpsc, watch};
 
 use crate::config::ServerConfig;
 use crate::engine::{
-    build_engine, Engine, EngineAudio, EngineConfig, EngineError, EngineRequest, EngineResponse,
-    SessionManager,
+    build_engine, AssistantSlot, AssistantText, Engine, EngineAudio, EngineConfig, EngineError,
+    EngineRequest, EngineResponse, SessionManager,
 };
 use crate::protocol::{
     ClientCommand, RuntimeState, ServerReply, SpeechRecCommand, SpeechRecEvent, StatusSnapshot,
@@ -42,6 +45,10 @@ enum OrchestratorEvent {
         result: Result<EngineResponse, EngineError>,
         started_at: Instant,
     },
+    /// The text of a reply whose audio started before the LLM finished, for
+    /// the history slot reserved when its audio started. Kept after barge-in,
+    /// since the reply was partly heard and later turns follow on from it.
+    AssistantText { slot: AssistantSlot, text: String },
 }
 
 impl Orchestrator {
@@ -73,7 +80,7 @@ impl Orchestrator {
     async fn run(
         &mut self,
         mut client_rx: mpsc::Receiver<ClientCommand>,
-        mut voice_events: broadcast::Receiver<VoiceInputEvent>,
+        mut voice_events: mpsc::Receiver<VoiceInputEvent>,
         mut sr_events: broadcast::Receiver<SpeechRecEvent>,
         mut voice_output_events: broadcast::Receiver<VoiceOutputEvent>,
         mut internal_rx: mpsc::Receiver<OrchestratorEvent>,
@@ -93,11 +100,8 @@ impl Orchestrator {
                 }
                 event = voice_events.recv() => {
                     match event {
-                        Ok(event) => self.handle_voice_event(event).await,
-                        Err(broadcast::error::RecvError::Lagged(count)) => {
-                            tracing::warn!("voice input events lagged by {}", count);
-                        }
-                        Err(broadcast::error::RecvError::Closed) => break,
+                        Some(event) => self.handle_voice_event(event).await,
+                        None => break,
                     }
                 }
                 event = sr_events.recv() => {
@@ -147,6 +151,19 @@ impl Orchestrator {
                 }
             }
             ClientCommand::AudioFile { path } => {
+                // Check the file before entering Speaking: a failed open in voice output
+                // never emits Finished and would leave the runtime stuck in that state.
+                match tokio::fs::metadata(&path).await {
+                    Ok(metadata) if metadata.is_file() => {}
+                    Ok(_) => {
+                        tracing::warn!("ignoring audio file {}: not a file", path);
+                        return;
+                    }
+                    Err(err) => {
+                        tracing::warn!("ignoring audio file {}: {}", path, err);
+                        return;
+                    }
+                }
                 self.set_state(RuntimeState::Speaking);
                 let _ = self.voice_output.send(VoiceOutputCommand::PlayAudioFile { path }).await;
             }
@@ -208,11 +225,6 @@ impl Orchestrator {
 
     async fn handle_speech_event(&mut self, event: SpeechRecEvent) {
         match event {
-            SpeechRecEvent::Text { text, is_final } => {
-                if is_final {
-                    self.process_text(text).await;
-                }
-            }
             SpeechRecEvent::Final { text } => match text {
                 Some(text) => {
                     self.process_text(text).await;
@@ -246,10 +258,29 @@ impl Orchestrator {
                 if self.generation.load(Ordering::SeqCst) == generation {
                     match result {
                         Ok(response) => {
-                            if let Some(text) = response.assistant_text {
-                                self.session.add_assistant_message(text);
-                            } else {
-                                self.session.add_assistant_placeholder();
+                            match response.assistant_text {
+                                AssistantText::Ready(text) => {
+                                    self.session.add_assistant_message(text);
+                                }
+                                AssistantText::Pending(text_rx) => {
+                                    // Hold the reply's place now; later turns may be
+                                    // recorded before its text arrives.
+                                    let slot = self.session.reserve_assistant_message();
+                                    let tx = self.internal_tx.clone();
+                                    tokio::spawn(async move {
+                                        if let Ok(text) = text_rx.await {
+                                            let _ = tx
+                                                .send(OrchestratorEvent::AssistantText {
+                                                    slot,
+                                                    text,
+                                                })
+                                                .await;
+                                        }
+                                    });
+                                }
+                                AssistantText::Unavailable => {
+                                    self.session.add_assistant_placeholder();
+                                }
                             }
 
                             self.set_state(RuntimeState::Speaking);
@@ -260,7 +291,7 @@ impl Orchestrator {
                                         .send(VoiceOutputCommand::PlayAudio { audio })
                                         .await;
                                 }
-                                EngineAudio::Stream(mut audio) => {
+                                EngineAudio::Stream(audio) => {
                                     let voice_output = self.voice_output.clone();
                                     let generation_ref = self.generation.clone();
                                     let started_at = started_at;
@@ -275,49 +306,47 @@ impl Orchestrator {
                                         {
                                             return;
                                         }
-                                        while let Some(chunk) = audio.stream.as_mut().next().await {
+                                        // Chunks that are already waiting go out as one
+                                        // command; the stream is never held back for more.
+                                        let mut batches =
+                                            audio.stream.ready_chunks(ENGINE_STREAM_BATCH_CHUNKS);
+                                        while let Some(batch) = batches.next().await {
                                             if generation_ref.load(Ordering::SeqCst) != generation {
                                                 let _ = voice_output
                                                     .send(VoiceOutputCommand::Stop)
                                                     .await;
                                                 return;
                                             }
-                                            match chunk {
-                                                Ok(bytes) => {
-                                                    if !logged_first_chunk {
-                                                        let wait = started_at.elapsed();
-                                                        tracing::info!(
-                                                            "engine stream first chunk after {:.0}ms ({} bytes)",
-                                                            wait.as_secs_f64() * 1000.0,
-                                                            bytes.len()
-                                                        );
-                                                        logged_first_chunk = true;
-                                                    }
-                                                    
-                                                    if voice_output
-                                                        .send(VoiceOutputCommand::StreamChunk {
-                                                            data: bytes.to_vec(),
-                                                        })
-                                                        .await
-                                                        .is_err()
-                                                    {
-                                                        tracing::warn!(
-                                                            "voice output stream closed unexpectedly"
-                                                        );
-                                                        return;
-                                                    }
+                                            let (data, failure) = coalesce_chunks(batch);
+                                            if !data.is_empty() {
+                                                if !logged_first_chunk {
+                                                    let wait = started_at.elapsed();
+                                                    tracing::info!(
+                                                        "engine stream first chunk after {:.0}ms ({} bytes)",
+                                                        wait.as_secs_f64() * 1000.0,
+                                                        data.len()
+                                                    );
+                                                    logged_first_chunk = true;
                                                 }
-                                                Err(err) => {
+
+                                                if voice_output
+                                                    .send(VoiceOutputCommand::StreamChunk { data })
+                                                    .await
+                                                    .is_err()
+                                                {
                                                     tracing::warn!(
-                                                        "engine stream failed: {}",
-                                                        err
+                                                        "voice output stream closed unexpectedly"
                                                     );
-                                                    let _ = voice_output
-                                                        .send(VoiceOutputCommand::Stop)
-                                                        .await;
                                                     return;
                                                 }
                                             }
+                                            if let Some(err) = failure {
+                                                tracing::warn!("engine stream failed: {}", err);
+                                                let _ = voice_output
+                                                    .send(VoiceOutputCommand::Stop)
+                                                    .await;
+                                                return;
+                                            }
                                         }
                                         let _ = voice_output
                                             .send(VoiceOutputCommand::EndStream)
@@ -335,6 +364,11 @@ impl Orchestrator {
                     tracing::info!("dropping stale engine response");
                 }
             }
+            OrchestratorEvent::AssistantText { slot, text } => {
+                if !self.session.fill_assistant_message(&slot, text) {
+                    tracing::info!("dropping assistant text from an earlier session");
+                }
+            }
         }
     }
 
@@ -344,14 +378,18 @@ impl Orchestrator {
             return;
         }
 
-        if self.session.maybe_rollover(self.session_timeout) {
+        // One clock read per turn covers the timeout check, the message
+        // timestamp and the latency measurement.
+        let started_at = Instant::now();
+        if self.session.maybe_rollover_at(started_at, self.session_timeout) {
             tracing::info!("session timed out; starting new session");
         }
 
-        self.session.add_user_message(&text);
+        // Shared with the session, so the request does not copy the text.
+        let text: Arc<str> = Arc::from(text);
+        self.session.add_user_message_at(text.clone(), started_at);
         self.set_state(RuntimeState::Processing);
         let generation = self.generation.load(Ordering::SeqCst);
-        let started_at = Instant::now();
         let tx = self.internal_tx.clone();
         let engine = self.engine.clone();
         let history = self.session.history().to_vec();
@@ -423,7 +461,9 @@ pub async fn run_server(config: ServerConfig) -> Result<(), String> {
         lid_open: true,
     });
 
-    let (voice_events_tx, voice_events_rx) = broadcast::channel(32);
+    // Voice input has a single consumer and carries AudioEnded, so it uses an mpsc
+    // channel: a slow orchestrator applies backpressure instead of dropping events.
+    let (voice_events_tx, voice_events_rx) = mpsc::channel(32);
     let (sr_events_tx, sr_events_rx) = broadcast::channel(32);
     let (voice_output_events_tx, voice_output_events_rx) = broadcast::channel(32);
 
@@ -531,6 +571,23 @@ pub async fn run_server(config: ServerConfig) -> Result<(), String> {
     Ok(())
 }
 
+/// Upper bound on engine stream chunks merged into one voice output command.
+const ENGINE_STREAM_BATCH_CHUNKS: usize = 32;
+
+/// Joins a batch of engine stream chunks, stopping at the first error. A
+/// single chunk hands over its buffer when the engine holds the only reference.
+fn coalesce_chunks(batch: Vec<Result<Bytes, EngineError>>) -> (Vec<u8>, Option<EngineError>) {
+    let mut data = Vec::new();
+    for chunk in batch {
+        match chunk {
+            Ok(bytes) if data.is_empty() => data = Vec::from(bytes),
+            Ok(bytes) => data.extend_from_slice(&bytes),
+            Err(err) => return (data, Some(err)),
+        }
+    }
+    (data, None)
+}
+
 fn session_timeout_from_env() -> Duration {
     let value = env::var("SESSION_TIMEOUT_SECONDS")
         .ok()
@@ -561,6 +618,11 @@ async fn tcp_server(
             accept = listener.accept() => {
                 match accept {
                     Ok((stream, _)) => {
+                        // Replies are small and latency-bound; don't let Nagle hold
+                        // them back waiting for the client's ACK.
+                        if let Err(err) = stream.set_nodelay(true) {
+                            tracing::warn!("failed to set TCP_NODELAY: {}", err);
+                        }
                         let tx = client_tx.clone();
                         let status = status_rx.clone();
                         tokio::spawn(async move { handle_connection(stream, tx, status).await; });
@@ -574,35 +636,41 @@ async fn tcp_server(
     }
 }
 
+// Streamed audio arrives as JSON byte arrays, several times the size of the
+// raw chunk, so the default 8 KiB reader would need many reads per command.
+const CONNECTION_READ_BUFFER_BYTES: usize = 64 * 1024;
+
 async fn handle_connection(
     mut stream: TcpStream,
     client_tx: mpsc::Sender<ClientCommand>,
     status_rx: watch::Receiver<StatusSnapshot>,
 ) {
-    let (reader, mut writer) = stream.split();
-    let mut lines = BufReader::new(reader).lines();
+    let (reader, writer) = stream.split();
+    let mut reader = BufReader::with_capacity(CONNECTION_READ_BUFFER_BYTES, reader);
+    // One line buffer per connection, reused for every command; streamed audio
+    // lines are large, so this avoids a fresh allocation per chunk. Lines stay
+    // raw bytes: serde_json validates UTF-8 only inside string tokens, so the
+    // separate full-line check read_line would do is skipped.
+    let mut line = Vec::new();
+    // Replies are buffered and flushed once no further complete command is
+    // already waiting, so a pipelined batch is answered with one write.
+    let mut writer = BufWriter::new(writer);
 
-    while let Ok(Some(line)) = lines.next_line().await {
-        let reply = match serde_json::from_str::<ClientCommand>(&line) {
+    loop {
+        line.clear();
+        match reader.read_until(b'\n', &mut line).await {
+            Ok(0) | Err(_) => break,
+            Ok(_) => {}
+        }
+        let payload: Cow<'static, str> = match decode_command(&line) {
+            Ok(ClientCommand::Status) => Cow::Borrowed(status_reply(&status_rx.borrow())),
             Ok(command) => {
-                if let ClientCommand::Status = command {
-                    let status = status_rx.borrow().clone();
-                    ServerReply::Status { status }
-                } else {
-                    let _ = client_tx.send(command).await;
-                    ServerReply::Ok {
-                        message: "accepted".to_string(),
-                    }
-                }
+                let _ = client_tx.send(command).await;
+                Cow::Borrowed(accepted_reply())
             }
-            Err(err) => ServerReply::Error {
+            Err(err) => Cow::Owned(encode_reply(&ServerReply::Error {
                 message: format!("invalid command: {}", err),
-            },
-        };
-
-        let payload = match serde_json::to_string(&reply) {
-            Ok(payload) => payload,
-            Err(err) => format!("{{\"type\":\"error\",\"message\":\"{}\"}}", err),
+            })),
         };
 
         if writer.write_all(payload.as_bytes()).await.is_err() {
@@ -611,5 +679,81 @@ async fn handle_connection(
         if writer.write_all(b"\n").await.is_err() {
             break;
         }
+        let pipelined = reader.buffer().contains(&b'\n');
+        if !pipelined && writer.flush().await.is_err() {
+            break;
+        }
+    }
+}
+
+/// Borrowed view of an `audio_stream_chunk` line.
+#[derive(Deserialize)]
+struct AudioStreamChunkLine<'a> {
+    #[serde(rename = "type", borrow)]
+    kind: Cow<'a, str>,
+    data: Vec<u8>,
+}
+
+const AUDIO_STREAM_CHUNK_TAG: &[u8] = b"\"audio_stream_chunk\"";
+
+/// `ClientCommand` is internally tagged, so serde buffers every value of a
+/// line before picking the variant; for audio chunks that is one buffered
+/// value per byte. Chunks are decoded straight into their byte vector
+/// instead, and every other command takes the regular path. Lines without
+/// the chunk tag skip the chunk attempt, so they are only parsed once.
+fn decode_command(line: &[u8]) -> serde_json::Result<ClientCommand> {
+    let tagged = line
+        .windows(AUDIO_STREAM_CHUNK_TAG.len())
+        .any(|window| window == AUDIO_STREAM_CHUNK_TAG);
+    if tagged {
+        if let Ok(chunk) = serde_json::from_slice::<AudioStreamChunkLine>(line) {
+            if chunk.kind == "audio_stream_chunk" {
+                return Ok(ClientCommand::AudioStreamChunk { data: chunk.data });
+            }
+        }
+    }
+    serde_json::from_slice(line)
+}
+
+/// The acknowledgement sent for every forwarded command, serialized once.
+fn accepted_reply() -> &'static str {
+    static ACCEPTED_REPLY: OnceLock<String> = OnceLock::new();
+    ACCEPTED_REPLY.get_or_init(|| {
+        encode_reply(&ServerReply::Ok {
+            message: "accepted".to_string(),
+        })
+    })
+}
+
+/// A snapshot only has 20 possible values, so every status reply is serialized
+/// once and picked by index instead of running the encoder per request.
+fn status_reply(status: &StatusSnapshot) -> &'static str {
+    static STATUS_REPLIES: OnceLock<Vec<String>> = OnceLock::new();
+    let replies = STATUS_REPLIES.get_or_init(|| {
+        let mut replies = Vec::with_capacity(RuntimeState::ALL.len() * 4);
+        for state in RuntimeState::ALL {
+            for mic_muted in [false, true] {
+                for lid_open in [false, true] {
+                    replies.push(encode_reply(&ServerReply::Status {
+                        status: StatusSnapshot {
+                            state,
+                            mic_muted,
+                            lid_open,
+                        },
+                    }));
+                }
+            }
+        }
+        replies
+    });
+    let index =
+        (status.state as usize) * 4 + (status.mic_muted as usize) * 2 + status.lid_open as usize;
+    &replies[index]
+}
+
+fn encode_reply(reply: &ServerReply) -> String {
+    match serde_json::to_string(reply) {
+        Ok(payload) => payload,
+        Err(err) => format!("{{\"type\":\"error\",\"message\":\"{}\"}}", err),
     }
 }
@@ -10,6 +10,15 @@ pub enum RuntimeState {
 }
 
 impl RuntimeState {
+    /// Every state, in declaration order (so `state as usize` indexes it).
+    pub const ALL: [RuntimeState; 5] = [
+        RuntimeState::Idle,
+        RuntimeState::Listening,
+        RuntimeState::Transcribing,
+        RuntimeState::Processing,
+        RuntimeState::Speaking,
+    ];
+
     pub fn as_str(&self) -> &'static str {
         match self {
             RuntimeState::Idle => "Idle",
@@ -59,6 +68,12 @@ pub enum ServerReply {
     Error { message: String },
 }
 
+// Wire layout of `VoiceInputEvent::AudioChunk` when STREAM_SAMPLE_RATE /
+// STREAM_CHANNELS are unset. Producer and consumer must agree, so both read
+// their defaults from here.
+pub const DEFAULT_STREAM_SAMPLE_RATE: u32 = 16_000;
+pub const DEFAULT_STREAM_CHANNELS: u16 = 1;
+
 #[derive(Debug, Clone)]
 pub enum VoiceInputEvent {
     AudioChunk(Vec<u8>),
@@ -67,7 +82,6 @@ pub enum VoiceInputEvent {
 
 #[derive(Debug, Clone)]
 pub enum SpeechRecEvent {
-    Text { text: String, is_final: bool },
     Final { text: Option<String> },
 }
 
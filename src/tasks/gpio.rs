@@ -26,7 +26,10 @@ pub async fn run(
     {
         use std::time::Duration;
 
-        use rppal::gpio::{Gpio, Level, OutputPin};
+        use std::sync::Arc;
+
+        use rppal::gpio::{Gpio, Level, OutputPin, Trigger};
+        use tokio::sync::Notify;
         use tokio::time;
 
         let mut shutdown = shutdown;
@@ -38,7 +41,7 @@ pub async fn run(
             }
         };
 
-        let button: Option<rppal::gpio::InputPin> = match config.button_pin {
+        let mut button: Option<rppal::gpio::InputPin> = match config.button_pin {
             Some(pin) => match gpio.get(pin).map(|p| p.into_input_pullup()) {
                 Ok(pin) => Some(pin),
                 Err(err) => {
@@ -49,7 +52,7 @@ pub async fn run(
             None => None,
         };
 
-        let lid: Option<rppal::gpio::InputPin> = match config.lid_pin {
+        let mut lid: Option<rppal::gpio::InputPin> = match config.lid_pin {
             Some(pin) => match gpio.get(pin).map(|p| p.into_input_pullup()) {
                 Ok(pin) => Some(pin),
                 Err(err) => {
@@ -100,37 +103,55 @@ pub async fn run(
         let mut last_button_level = button.as_ref().map(|p| p.read());
         let mut last_lid_level = lid.as_ref().map(|p| p.read());
 
+        // Edge interrupts wake the loop only when an input changes; the 50ms
+        // poll is kept as a fallback when they cannot be registered.
+        let wake = Arc::new(Notify::new());
+        let mut interrupts = true;
+        for pin in [button.as_mut(), lid.as_mut()].into_iter().flatten() {
+            let wake = wake.clone();
+            if let Err(err) =
+                pin.set_async_interrupt(Trigger::Both, None, move |_| wake.notify_one())
+            {
+                tracing::warn!("gpio interrupts unavailable; polling inputs: {}", err);
+                interrupts = false;
+            }
+        }
+
         let mut tick = time::interval(Duration::from_millis(50));
         loop {
             tokio::select! {
                 _ = shutdown.changed() => {
                     break;
                 }
-                _ = tick.tick() => {
-                    if let Some(pin) = button.as_ref() {
-                        let level = pin.read();
-                        if Some(level) != last_button_level {
-                            last_button_level = Some(level);
-                            if level == Level::Low {
-                                let _ = sender.send(ClientCommand::ButtonPress).await;
-                            } else {
-                                let _ = sender.send(ClientCommand::ButtonRelease).await;
-                            }
-                        }
+                _ = wake.notified(), if interrupts => {
+                    // Let contacts settle so a bounce reads as one change.
+                    time::sleep(Duration::from_millis(20)).await;
+                }
+                _ = tick.tick(), if !interrupts => {}
+            }
+
+            if let Some(pin) = button.as_ref() {
+                let level = pin.read();
+                if Some(level) != last_button_level {
+                    last_button_level = Some(level);
+                    if level == Level::Low {
+                        let _ = sender.send(ClientCommand::ButtonPress).await;
+                    } else {
+                        let _ = sender.send(ClientCommand::ButtonRelease).await;
                     }
+                }
+            }
 
-                    if let Some(pin) = lid.as_ref() {
-                        let level = pin.read();
-                        if Some(level) != last_lid_level {
-                            last_lid_level = Some(level);
-                            match level {
-                                Level::Low => {
-                                    let _ = sender.send(ClientCommand::LidClose).await;
-                                }
-                                Level::High => {
-                                    let _ = sender.send(ClientCommand::LidOpen).await;
-                                }
-                            }
+            if let Some(pin) = lid.as_ref() {
+                let level = pin.read();
+                if Some(level) != last_lid_level {
+                    last_lid_level = Some(level);
+                    match level {
+                        Level::Low => {
+                            let _ = sender.send(ClientCommand::LidClose).await;
+                        }
+                        Level::High => {
+                            let _ = sender.send(ClientCommand::LidOpen).await;
                         }
                     }
                 }
@@ -216,6 +237,9 @@ async fn run_status_led(
     use std::time::Instant;
 
     let pwm_period = Duration::from_secs_f32(1.0 / config.pwm_hz as f32);
+    // Per-config constants for the pulse curve, computed once rather than every PWM cycle.
+    let pulse_cycles_per_sec = 1.0 / config.processing_cycle.as_secs_f32().max(f32::EPSILON);
+    let state_table = led_state_table(&config);
     let mut target = 0.0f32;
     let mut mode = LedMode::Fixed;
     let mut pulse_phase_start = Instant::now();
@@ -224,12 +248,14 @@ async fn run_status_led(
     let initial_status = status_rx.borrow().clone();
     apply_state_target(
         &initial_status,
-        &config,
+        &state_table,
         &mut mode,
         &mut target,
         &mut pulse_phase_start,
     );
     let mut current = target;
+    // Only target changes are logged; the PWM loop itself runs at
+    // GPIO_STATUS_LED_PWM_HZ and stays silent.
     let mut last_logged_target = target;
     let mut last_logged_mode = mode;
     tracing::trace!(
@@ -250,7 +276,7 @@ async fn run_status_led(
             let status = status_rx.borrow_and_update().clone();
             apply_state_target(
                 &status,
-                &config,
+                &state_table,
                 &mut mode,
                 &mut target,
                 &mut pulse_phase_start,
@@ -270,61 +296,33 @@ async fn run_status_led(
 
         let now = Instant::now();
         let duty = if mode == LedMode::Pulse {
-            let cycle_secs = config.processing_cycle.as_secs_f32().max(f32::EPSILON);
             let elapsed = now.saturating_duration_since(pulse_phase_start).as_secs_f32();
-            let t = (elapsed / cycle_secs) % 1.0;
-            let s = 0.5 - 0.5 * (2.0 * std::f32::consts::PI * t).cos();
-            let duty = s.powf(config.gamma).clamp(0.0, 1.0);
-            if (duty - last_logged_target).abs() > f32::EPSILON || mode != last_logged_mode {
-                tracing::trace!(
-                    target: "alicepi::tasks::gpio::status_led::per_cycle",
-                    duty = duty,
-                    mode = ?mode,
-                    "status led pulse duty updated"
-                );
-                last_logged_target = duty;
-                last_logged_mode = mode;
-            }
-            duty
+            let t = (elapsed * pulse_cycles_per_sec).fract();
+            let s = 0.5 - 0.5 * (std::f32::consts::TAU * t).cos();
+            s.powf(config.gamma).clamp(0.0, 1.0)
         } else {
             let dt = now.saturating_duration_since(last_update);
             current = step_toward(current, target, dt, config.transition_time);
             last_update = now;
             current.clamp(0.0, 1.0)
         };
-        if duty <= 0.0 {
-            tracing::trace!(
-                duty = duty,
-                target = target,
-                mode = ?mode,
-                "status led pwm cycle (off)"
-            );
-            pin.set_low();
-            tokio::time::sleep(pwm_period).await;
-            continue;
-        }
-        if duty >= 1.0 {
-            tracing::trace!(
-                duty = duty,
-                target = target,
-                mode = ?mode,
-                "status led pwm cycle (on)"
-            );
-            pin.set_high();
-            tokio::time::sleep(pwm_period).await;
+        if duty <= 0.0 || duty >= 1.0 {
+            if duty >= 1.0 {
+                pin.set_high();
+            } else {
+                pin.set_low();
+            }
+            if mode == LedMode::Fixed && (current - target).abs() <= f32::EPSILON {
+                wait_for_led_change(&mut status_rx, &mut shutdown, pwm_period).await;
+                last_update = Instant::now();
+            } else {
+                tokio::time::sleep(pwm_period).await;
+            }
             continue;
         }
 
         let on_time = pwm_period.mul_f32(duty);
         let off_time = pwm_period.saturating_sub(on_time);
-        tracing::trace!(
-            duty = duty,
-            target = target,
-            mode = ?mode,
-            on_ms = on_time.as_secs_f32() * 1000.0,
-            off_ms = off_time.as_secs_f32() * 1000.0,
-            "status led pwm cycle"
-        );
         pin.set_high();
         tokio::time::sleep(on_time).await;
         pin.set_low();
@@ -334,26 +332,69 @@ async fn run_status_led(
     pin.set_low();
 }
 
+/// Parks a settled, fully on/off LED until the status or shutdown flag changes,
+/// instead of re-driving the same level every PWM period.
+#[cfg(feature = "gpio")]
+async fn wait_for_led_change(
+    status_rx: &mut watch::Receiver<StatusSnapshot>,
+    shutdown: &mut watch::Receiver<bool>,
+    pwm_period: Duration,
+) {
+    tokio::select! {
+        changed = status_rx.changed() => {
+            match changed {
+                // Leave the update pending for the main loop to apply.
+                Ok(()) => status_rx.mark_changed(),
+                Err(_) => tokio::time::sleep(pwm_period).await,
+            }
+        }
+        changed = shutdown.changed() => {
+            match changed {
+                Ok(()) => shutdown.mark_changed(),
+                Err(_) => tokio::time::sleep(pwm_period).await,
+            }
+        }
+    }
+}
+
+/// LED mode and target brightness for each runtime state, indexed by
+/// `state as usize`. Resolved once from the config so a state change is a
+/// table lookup.
+#[cfg(feature = "gpio")]
+type LedStateTable = [(LedMode, f32); RuntimeState::ALL.len()];
+
+#[cfg(feature = "gpio")]
+fn led_state_table(config: &StatusLedConfig) -> LedStateTable {
+    RuntimeState::ALL.map(|state| {
+        let mode = desired_led_mode(state, config.pulse_while_speaking);
+        let target = match mode {
+            LedMode::Pulse => config.idle_brightness,
+            LedMode::Fixed => fixed_target_for_state(state, config),
+        };
+        (mode, target)
+    })
+}
+
 #[cfg(feature = "gpio")]
 fn apply_state_target(
     status: &StatusSnapshot,
-    config: &StatusLedConfig,
+    state_table: &LedStateTable,
     mode: &mut LedMode,
     target: &mut f32,
     pulse_phase_start: &mut Instant,
 ) {
-    let desired_mode = desired_led_mode(status.state, config.pulse_while_speaking);
+    let (desired_mode, desired_target) = state_table[status.state as usize];
     match desired_mode {
         LedMode::Pulse => {
             if *mode != LedMode::Pulse {
                 *mode = LedMode::Pulse;
-                *target = config.idle_brightness;
+                *target = desired_target;
                 *pulse_phase_start = Instant::now();
             }
         }
         LedMode::Fixed => {
             *mode = LedMode::Fixed;
-            *target = fixed_target_for_state(status.state, config);
+            *target = desired_target;
         }
     }
 }
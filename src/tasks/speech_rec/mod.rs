@@ -1,13 +1,15 @@
 use std::env;
 use std::path::{Path, PathBuf};
+use std::sync::Arc;
 use std::time::{Duration, Instant, SystemTime, UNIX_EPOCH};
 
-use bytemuck::cast_slice;
-use tokio::sync::{broadcast, mpsc, oneshot, watch};
+use tokio::sync::{broadcast, mpsc, watch};
 use tokio::time;
 
 use crate::model_download;
-use crate::protocol::{SpeechRecCommand, SpeechRecEvent};
+use crate::protocol::{
+    DEFAULT_STREAM_CHANNELS, DEFAULT_STREAM_SAMPLE_RATE, SpeechRecCommand, SpeechRecEvent,
+};
 use crate::watchdog::Heartbeat;
 
 mod whisper;
@@ -26,6 +28,49 @@ pub trait SpeechRecStrategy: Send {
     fn reset(&mut self);
 }
 
+/// Sample rate and channel count of the buffered utterance, fixed by its
+/// first chunk. Shared by the backends that buffer a whole utterance.
+#[derive(Debug, Default)]
+struct StreamFormat {
+    sample_rate: Option<u32>,
+    channels: Option<u16>,
+}
+
+impl StreamFormat {
+    /// Records the format of the first chunk and rejects chunks that differ.
+    fn lock(&mut self, sample_rate: u32, channels: u16) -> Result<(), String> {
+        if let Some(existing) = self.sample_rate {
+            if existing != sample_rate {
+                return Err(format!(
+                    "sample rate changed from {} to {}",
+                    existing, sample_rate
+                ));
+            }
+        } else {
+            self.sample_rate = Some(sample_rate);
+        }
+        if let Some(existing) = self.channels {
+            if existing != channels {
+                return Err(format!(
+                    "channel count changed from {} to {}",
+                    existing, channels
+                ));
+            }
+        } else {
+            self.channels = Some(channels);
+        }
+        Ok(())
+    }
+
+    fn get(&self) -> Option<(u32, u16)> {
+        Some((self.sample_rate?, self.channels?))
+    }
+
+    fn clear(&mut self) {
+        *self = Self::default();
+    }
+}
+
 #[derive(Debug, Clone, Copy, PartialEq, Eq)]
 enum SpeechRecEngine {
     Whisper,
@@ -50,28 +95,44 @@ impl SpeechRecEngine {
 struct SpeechRecConfig {
     sample_rate: u32,
     channels: u16,
-    engine: SpeechRecEngine,
-    whisper: whisper::WhisperConfig,
-    #[allow(dead_code)]
-    sherpa: SherpaConfig,
-    moonshine: moonshine::MoonshineConfig,
+    backend: BackendConfig,
     hangover_silence: Duration,
 }
 
+/// Settings for the selected engine only. The others are never read from the
+/// environment, so e.g. whisper startup skips sherpa's model-path probing.
+#[derive(Debug, Clone)]
+enum BackendConfig {
+    Whisper(whisper::WhisperConfig),
+    SherpaZipformer(SherpaConfig),
+    MoonshineOnnx(moonshine::MoonshineConfig),
+}
+
+impl BackendConfig {
+    fn from_env(engine: SpeechRecEngine, sample_rate: u32) -> Self {
+        match engine {
+            SpeechRecEngine::Whisper => BackendConfig::Whisper(whisper::WhisperConfig::from_env()),
+            SpeechRecEngine::SherpaZipformer => {
+                BackendConfig::SherpaZipformer(SherpaConfig::from_env(sample_rate))
+            }
+            SpeechRecEngine::MoonshineOnnx => {
+                BackendConfig::MoonshineOnnx(moonshine::MoonshineConfig::from_env())
+            }
+        }
+    }
+}
+
 impl SpeechRecConfig {
     fn from_env() -> Self {
-        let sample_rate = env_u32("STREAM_SAMPLE_RATE", 16_000);
-        let channels = env_u16("STREAM_CHANNELS", 1);
+        let sample_rate = env_u32("STREAM_SAMPLE_RATE", DEFAULT_STREAM_SAMPLE_RATE);
+        let channels = env_u16("STREAM_CHANNELS", DEFAULT_STREAM_CHANNELS);
         let hangover_ms = env_u64("SILENCE_DURATION_MS", 500);
-        let engine = SpeechRecEngine::from_env();
+        let backend = BackendConfig::from_env(SpeechRecEngine::from_env(), sample_rate);
 
         Self {
             sample_rate,
             channels,
-            engine,
-            whisper: whisper::WhisperConfig::from_env(),
-            sherpa: SherpaConfig::from_env(sample_rate),
-            moonshine: moonshine::MoonshineConfig::from_env(),
+            backend,
             hangover_silence: Duration::from_millis(hangover_ms),
         }
     }
@@ -116,7 +177,7 @@ impl SherpaConfig {
             model_name: env::var("SR_SHERPA_MODEL")
                 .unwrap_or_else(|_| "zipformer-en-2023-06-26".to_string()),
             model_variant: env::var("SR_SHERPA_MODEL_VARIANT")
-                .unwrap_or_else(|_| "fp32".to_string()),
+                .unwrap_or_else(|_| "int8".to_string()),
             model_dir: env::var("SR_SHERPA_MODEL_DIR").unwrap_or_default(),
             provider: env::var("SR_SHERPA_PROVIDER").unwrap_or_else(|_| "cpu".to_string()),
             decoding_method: env::var("SR_SHERPA_DECODING_METHOD")
@@ -206,56 +267,79 @@ pub async fn run(
 
     tracing::info!("speech_rec:run using config: {:?}", config);
 
-    if config.engine == SpeechRecEngine::Whisper {
-        let result = run_with_heartbeat(&heartbeat, model_download::ensure_whisper_model(&config.whisper.model)).await;
-        if let Err(err) = result {
-            tracing::warn!("whisper model download failed: {}", err);
-        }
-    }
-    if config.engine == SpeechRecEngine::SherpaZipformer {
-        let model_dir = if config.sherpa.model_dir.trim().is_empty() {
-            None
-        } else {
-            Some(Path::new(&config.sherpa.model_dir))
-        };
-        let result = run_with_heartbeat(
-            &heartbeat,
-            model_download::ensure_sherpa_zipformer_model(
-                &config.sherpa.model_name,
-                &config.sherpa.model_variant,
-                model_dir,
-            ),
-        )
-        .await;
-        match result {
-            Ok(Some(paths)) => {
-                config.sherpa.apply_defaults_from_paths(paths);
+    match &mut config.backend {
+        BackendConfig::Whisper(whisper_config) => {
+            let result = run_with_heartbeat(
+                &heartbeat,
+                model_download::ensure_whisper_model(&whisper_config.model),
+            )
+            .await;
+            if let Err(err) = result {
+                tracing::warn!("whisper model download failed: {}", err);
             }
-            Ok(None) => {}
-            Err(err) => {
-                tracing::warn!("sherpa model download failed: {}", err);
+        }
+        BackendConfig::SherpaZipformer(sherpa_config) => {
+            let model_dir = if sherpa_config.model_dir.trim().is_empty() {
+                None
+            } else {
+                Some(Path::new(&sherpa_config.model_dir))
+            };
+            let result = run_with_heartbeat(
+                &heartbeat,
+                model_download::ensure_sherpa_zipformer_model(
+                    &sherpa_config.model_name,
+                    &sherpa_config.model_variant,
+                    model_dir,
+                ),
+            )
+            .await;
+            match result {
+                Ok(Some(paths)) => {
+                    sherpa_config.apply_defaults_from_paths(paths);
+                }
+                Ok(None) => {}
+                Err(err) => {
+                    tracing::warn!("sherpa model download failed: {}", err);
+                }
             }
         }
-    }
-    if config.engine == SpeechRecEngine::MoonshineOnnx {
-        let model_dir = config.moonshine.model_dir.as_deref();
-        let result = run_with_heartbeat(
-            &heartbeat,
-            model_download::ensure_moonshine_model(
-                &config.moonshine.model,
-                &config.moonshine.precision,
-                model_dir,
-                &config.moonshine.tokenizer,
-            ),
-        )
-        .await;
-        if let Err(err) = result {
-            tracing::warn!("moonshine model download failed: {}", err);
+        BackendConfig::MoonshineOnnx(moonshine_config) => {
+            let model_dir = moonshine_config.model_dir.as_deref();
+            let result = run_with_heartbeat(
+                &heartbeat,
+                model_download::ensure_moonshine_model(
+                    &moonshine_config.model,
+                    &moonshine_config.precision,
+                    model_dir,
+                    &moonshine_config.tokenizer,
+                ),
+            )
+            .await;
+            if let Err(err) = result {
+                tracing::warn!("moonshine model download failed: {}", err);
+            }
         }
     }
 
     let (req_tx, mut resp_rx) = spawn_transcriber(config.clone());
+    // The directory is created once per task start rather than per saved request.
+    let save_request_wavs_dir: Option<Arc<Path>> = match save_request_wavs_dir {
+        Some(dir) => match tokio::fs::create_dir_all(&dir).await {
+            Ok(()) => Some(Arc::from(dir)),
+            Err(err) => {
+                tracing::warn!(
+                    "create dir {} failed; not saving request wavs: {}",
+                    dir.display(),
+                    err
+                );
+                None
+            }
+        },
+        None => None,
+    };
     let mut buffer: Vec<u8> = Vec::new();
+    // Request audio is only kept when it is going to be saved.
+    let record_requests = save_request_wavs_dir.is_some();
     let mut request_audio: Vec<i16> = Vec::new();
     let mut tick = time::interval(Duration::from_millis(500));
     tick.set_missed_tick_behavior(time::MissedTickBehavior::Delay);
@@ -263,6 +347,8 @@ pub async fn run(
     let mut last_log = Instant::now();
     let mut generation: u64 = 0;
     let mut request_id: u64 = 0;
+    // A non-audio command pulled off the queue while draining audio chunks.
+    let mut deferred: Option<SpeechRecCommand> = None;
 
     loop {
         tokio::select! {
@@ -271,8 +357,10 @@ pub async fn run(
             }
             _ = tick.tick() => {
                 heartbeat.tick();
-                if last_log.elapsed() >= Duration::from_secs(5) {
-                    let elapsed = last_log.elapsed().as_secs_f64().max(0.001);
+                let now = Instant::now();
+                let since_log = now.duration_since(last_log);
+                if since_log >= Duration::from_secs(5) {
+                    let elapsed = since_log.as_secs_f64().max(0.001);
                     let rate = chunk_count as f64 / elapsed;
                     tracing::debug!(
                         "speech_rec audio chunks: {} in {:.1}s ({:.1} chunks/sec)",
@@ -281,7 +369,7 @@ pub async fn run(
                         rate
                     );
                     chunk_count = 0;
-                    last_log = Instant::now();
+                    last_log = now;
                 }
             }
             response = resp_rx.recv() => {
@@ -304,15 +392,10 @@ pub async fn run(
                                     } else {
                                         let _ = events.send(SpeechRecEvent::Final { text: None });
                                     }
-                                } else if !text.trim().is_empty() {
-                                    tracing::info!(
-                                        "speech_rec result before orchestrator: is_final=false text={}",
-                                        text
-                                    );
-                                    let _ = events.send(SpeechRecEvent::Text {
-                                        text,
-                                        is_final: false,
-                                    });
+                                } else {
+                                    // Only finals drive the orchestrator; partials are
+                                    // logged and dropped here instead of being broadcast.
+                                    tracing::debug!("speech_rec partial result: {}", text);
                                 }
                             }
                             Ok(None) => {
@@ -334,19 +417,49 @@ pub async fn run(
                     }
                 }
             }
-            command = rx.recv() => {
+            command = async {
+                match deferred.take() {
+                    Some(command) => Some(command),
+                    None => rx.recv().await,
+                }
+            } => {
                 match command {
-                    Some(SpeechRecCommand::AudioChunk(chunk)) => {
-                        buffer.extend_from_slice(&chunk);
+                    Some(SpeechRecCommand::AudioChunk(mut chunk)) => {
                         chunk_count = chunk_count.saturating_add(1);
+                        // Take whatever audio queued up behind this chunk so the
+                        // worker gets one request per wakeup rather than per chunk.
+                        while let Ok(next) = rx.try_recv() {
+                            match next {
+                                SpeechRecCommand::AudioChunk(more) => {
+                                    chunk_count = chunk_count.saturating_add(1);
+                                    chunk.extend_from_slice(&more);
+                                }
+                                other => {
+                                    deferred = Some(other);
+                                    break;
+                                }
+                            }
+                        }
 
-                        let aligned_len = buffer.len() - (buffer.len() % 2);
-                        if aligned_len == 0 {
+                        let audio = if buffer.is_empty() {
+                            // Usual case: nothing carried over, so decode straight
+                            // from the chunk and stage only a trailing odd byte.
+                            let aligned_len = chunk.len() - (chunk.len() % 2);
+                            buffer.extend_from_slice(&chunk[aligned_len..]);
+                            pcm16_samples(&chunk[..aligned_len])
+                        } else {
+                            buffer.extend_from_slice(&chunk);
+                            let aligned_len = buffer.len() - (buffer.len() % 2);
+                            let audio = pcm16_samples(&buffer[..aligned_len]);
+                            buffer.drain(..aligned_len);
+                            audio
+                        };
+                        if audio.is_empty() {
                             continue;
                         }
-                        let audio: Vec<i16> = cast_slice(&buffer[..aligned_len]).to_vec();
-                        buffer.drain(..aligned_len);
-                        request_audio.extend_from_slice(&audio);
+                        if record_requests {
+                            request_audio.extend_from_slice(&audio);
+                        }
 
                         let request = TranscribeRequest::AudioChunk {
                             generation,
@@ -368,7 +481,9 @@ pub async fn run(
                             config.hangover_silence,
                         ) {
                             if !silence.is_empty() {
-                                request_audio.extend_from_slice(&silence);
+                                if record_requests {
+                                    request_audio.extend_from_slice(&silence);
+                                }
                                 let request = TranscribeRequest::AudioChunk {
                                     generation,
                                     audio: silence,
@@ -382,13 +497,19 @@ pub async fn run(
                         }
                         request_id = request_id.wrapping_add(1);
                         if let Some(save_dir) = save_request_wavs_dir.clone() {
-                            let audio_copy = request_audio.clone();
+                            // Hand the finished utterance to the writer instead of copying it.
+                            // Size the next buffer like this utterance so it does not regrow.
+                            let next_capacity = request_audio.len();
+                            let audio = std::mem::replace(
+                                &mut request_audio,
+                                Vec::with_capacity(next_capacity),
+                            );
                             spawn_request_wav_save(
                                 save_dir,
                                 request_id,
                                 config.sample_rate,
                                 config.channels,
-                                audio_copy,
+                                audio,
                             );
                         }
                         request_audio.clear();
@@ -411,30 +532,24 @@ pub async fn run(
     }
 }
 
+/// Keeps the heartbeat alive while `future` runs, ticking from the awaiting
+/// task itself rather than a separate ticker task.
 async fn run_with_heartbeat<F, T>(heartbeat: &Heartbeat, future: F) -> T
 where
     F: std::future::Future<Output = T>,
 {
-    let (stop_tx, mut stop_rx) = oneshot::channel::<()>();
-    let heartbeat = heartbeat.clone();
-    let ticker = tokio::spawn(async move {
-        let mut interval = time::interval(Duration::from_millis(250));
-        loop {
-            tokio::select! {
-                _ = interval.tick() => {
-                    heartbeat.tick();
-                }
-                _ = &mut stop_rx => {
-                    break;
-                }
+    tokio::pin!(future);
+    let mut interval = time::interval(Duration::from_millis(250));
+    loop {
+        tokio::select! {
+            result = &mut future => {
+                return result;
+            }
+            _ = interval.tick() => {
+                heartbeat.tick();
             }
         }
-    });
-
-    let result = future.await;
-    let _ = stop_tx.send(());
-    ticker.abort();
-    result
+    }
 }
 
 fn spawn_transcriber(
@@ -451,15 +566,45 @@ fn spawn_transcriber(
                 return;
             }
         };
+        warm_up_backend(backend.as_mut(), &config);
 
-        while let Some(request) = req_rx.blocking_recv() {
+        let mut deferred: Option<TranscribeRequest> = None;
+        loop {
+            let request = match deferred.take() {
+                Some(request) => request,
+                None => match req_rx.blocking_recv() {
+                    Some(request) => request,
+                    None => break,
+                },
+            };
             match request {
                 TranscribeRequest::AudioChunk {
                     generation,
-                    audio,
+                    mut audio,
                     sample_rate,
                     channels,
                 } => {
+                    // When the backend has fallen behind, hand it everything that
+                    // queued up in one call instead of one call per chunk.
+                    while let Ok(next) = req_rx.try_recv() {
+                        match next {
+                            TranscribeRequest::AudioChunk {
+                                generation: next_generation,
+                                audio: more,
+                                sample_rate: next_rate,
+                                channels: next_channels,
+                            } if next_generation == generation
+                                && next_rate == sample_rate
+                                && next_channels == channels =>
+                            {
+                                audio.extend_from_slice(&more);
+                            }
+                            other => {
+                                deferred = Some(other);
+                                break;
+                            }
+                        }
+                    }
                     let result = backend.on_audio_chunk(&audio, sample_rate, channels);
                     if let Err(err) = &result {
                         let _ = resp_tx.blocking_send(TranscribeResponse {
@@ -507,16 +652,36 @@ fn spawn_transcriber(
     (req_tx, resp_rx)
 }
 
+const WARM_UP_AUDIO: Duration = Duration::from_secs(1);
+
+/// Runs one silent utterance through a freshly loaded backend so the first
+/// real request doesn't pay for faulting in weights and first-run setup.
+fn warm_up_backend(backend: &mut dyn SpeechRecStrategy, config: &SpeechRecConfig) {
+    let Some(silence) = build_hangover_silence(config.sample_rate, config.channels, WARM_UP_AUDIO)
+    else {
+        return;
+    };
+    let started_at = Instant::now();
+    let result = backend
+        .on_audio_chunk(&silence, config.sample_rate, config.channels)
+        .and_then(|_| backend.on_audio_end());
+    backend.reset();
+    match result {
+        Ok(_) => tracing::info!("speech rec backend warmed up in {:?}", started_at.elapsed()),
+        Err(err) => tracing::warn!("speech rec warm-up failed: {}", err),
+    }
+}
+
 fn init_backend(config: &SpeechRecConfig) -> Result<Box<dyn SpeechRecStrategy>, String> {
-    match config.engine {
-        SpeechRecEngine::Whisper => {
-            let backend = whisper::init_whisper_backend(&config.whisper)?;
+    match &config.backend {
+        BackendConfig::Whisper(whisper_config) => {
+            let backend = whisper::init_whisper_backend(whisper_config)?;
             Ok(Box::new(backend))
         }
-        SpeechRecEngine::SherpaZipformer => {
+        BackendConfig::SherpaZipformer(_sherpa_config) => {
             #[cfg(feature = "sherpa")]
             {
-                let backend = sherpa::init_zipformer_backend(&config.sherpa)?;
+                let backend = sherpa::init_zipformer_backend(_sherpa_config)?;
                 Ok(Box::new(backend))
             }
             #[cfg(not(feature = "sherpa"))]
@@ -524,15 +689,15 @@ fn init_backend(config: &SpeechRecConfig) -> Result<Box<dyn SpeechRecStrategy>,
                 Err("sherpa engine requested but 'sherpa' feature disabled".to_string())
             }
         }
-        SpeechRecEngine::MoonshineOnnx => {
-            let backend = moonshine::init_moonshine_backend(&config.moonshine)?;
+        BackendConfig::MoonshineOnnx(moonshine_config) => {
+            let backend = moonshine::init_moonshine_backend(moonshine_config)?;
             Ok(Box::new(backend))
         }
     }
 }
 
 fn spawn_request_wav_save(
-    save_dir: PathBuf,
+    save_dir: Arc<Path>,
     request_id: u64,
     sample_rate: u32,
     channels: u16,
@@ -558,8 +723,6 @@ fn write_request_wav(
         return Ok(());
     }
 
-    std::fs::create_dir_all(save_dir)
-        .map_err(|err| format!("create dir {} failed: {}", save_dir.display(), err))?;
     let timestamp = SystemTime::now()
         .duration_since(UNIX_EPOCH)
         .unwrap_or_default()
@@ -574,11 +737,15 @@ fn write_request_wav(
     };
     let mut writer = hound::WavWriter::create(&path, spec)
         .map_err(|err| format!("open wav {} failed: {}", path.display(), err))?;
+    let sample_count = u32::try_from(audio.len())
+        .map_err(|_| format!("request wav {} too long", path.display()))?;
+    let mut samples = writer.get_i16_writer(sample_count);
     for sample in audio {
-        writer
-            .write_sample(*sample)
-            .map_err(|err| format!("write wav {} failed: {}", path.display(), err))?;
+        samples.write_sample(*sample);
     }
+    samples
+        .flush()
+        .map_err(|err| format!("write wav {} failed: {}", path.display(), err))?;
     writer
         .finalize()
         .map_err(|err| format!("finalize wav {} failed: {}", path.display(), err))?;
@@ -609,6 +776,47 @@ fn env_usize(key: &str, default: usize) -> usize {
     env::var(key).ok().and_then(|v| v.parse().ok()).unwrap_or(default)
 }
 
+const I16_TO_F32: f32 = 1.0 / i16::MAX as f32;
+
+/// Converts interleaved s16 audio to mono f32 for the ONNX-based backends,
+/// appending to `out` so callers can reuse one buffer across chunks. The
+/// loops are plain exact-size maps so the compiler can vectorize them.
+fn extend_mono_f32(
+    out: &mut Vec<f32>,
+    audio: &[i16],
+    channels: u16,
+    backend: &str,
+) -> Result<(), String> {
+    match channels {
+        1 => {
+            out.extend(audio.iter().map(|sample| *sample as f32 * I16_TO_F32));
+            Ok(())
+        }
+        // Sum in f32 and apply the averaging and scaling as one multiply.
+        2 => {
+            out.extend(
+                audio
+                    .chunks_exact(2)
+                    .map(|frame| (frame[0] as f32 + frame[1] as f32) * (0.5 * I16_TO_F32)),
+            );
+            Ok(())
+        }
+        _ => Err(format!(
+            "unsupported channel count {}; {} expects mono audio",
+            channels, backend
+        )),
+    }
+}
+
+/// Decodes native-endian s16 bytes as sent by voice input. Works on any
+/// alignment, unlike casting the byte buffer in place.
+fn pcm16_samples(bytes: &[u8]) -> Vec<i16> {
+    bytes
+        .chunks_exact(2)
+        .map(|pair| i16::from_ne_bytes([pair[0], pair[1]]))
+        .collect()
+}
+
 fn build_hangover_silence(
     sample_rate: u32,
     channels: u16,
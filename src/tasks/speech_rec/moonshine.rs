@@ -4,10 +4,11 @@ use std::path::PathBuf;
 
 use ort::tensor::TensorElementType;
 use ort::value::Tensor;
+use ort::session::builder::GraphOptimizationLevel;
 use ort::session::Session;
 use tokenizers::Tokenizer;
 
-use super::SpeechRecStrategy;
+use super::{env_f32, env_usize, extend_mono_f32, SpeechRecStrategy, StreamFormat};
 use crate::model_download;
 
 #[derive(Debug, Clone)]
@@ -30,7 +31,7 @@ impl MoonshineConfig {
     pub fn from_env() -> Self {
         let model = env::var("SR_MOONSHINE_MODEL").unwrap_or_else(|_| "moonshine/tiny".to_string());
         let model_name = model.split('/').last().unwrap_or(model.as_str());
-        let precision = env::var("SR_MOONSHINE_PRECISION").unwrap_or_else(|_| "float".to_string());
+        let precision = env::var("SR_MOONSHINE_PRECISION").unwrap_or_else(|_| "quantized".to_string());
         let model_dir = env::var("SR_MOONSHINE_MODEL_DIR").ok().map(PathBuf::from);
         let encoder = env::var("SR_MOONSHINE_ENCODER").unwrap_or_default();
         let decoder = env::var("SR_MOONSHINE_DECODER").unwrap_or_default();
@@ -75,9 +76,10 @@ pub struct MoonshineBackend {
     decoder_inputs: HashSet<String>,
     decoder_input_types: HashMap<String, TensorElementType>,
     tokenizer: Tokenizer,
-    buffer: Vec<i16>,
-    sample_rate: Option<u32>,
-    channels: Option<u16>,
+    // Mono f32 audio for the current utterance, converted chunk by chunk as
+    // it arrives so partials don't re-convert everything heard so far.
+    samples: Vec<f32>,
+    format: StreamFormat,
     last_partial: String,
     last_partial_samples: usize,
     model_spec: MoonshineModelSpec,
@@ -125,13 +127,13 @@ impl SpeechRecStrategy for MoonshineBackend {
         channels: u16,
     ) -> Result<Option<String>, String> {
         self.ensure_format(sample_rate, channels)?;
-        self.buffer.extend_from_slice(audio);
+        extend_mono_f32(&mut self.samples, audio, channels, "moonshine")?;
 
         if self.config.partial_secs <= 0.0 {
             return Ok(None);
         }
 
-        let mono_samples = self.buffer.len() / channels as usize;
+        let mono_samples = self.samples.len();
         if mono_samples == 0 {
             return Ok(None);
         }
@@ -159,9 +161,10 @@ impl SpeechRecStrategy for MoonshineBackend {
         }
 
         let start_sample = mono_samples.saturating_sub(window_samples);
-        let mono_audio = to_mono_f32(&self.buffer, channels)?;
-        let window = &mono_audio[start_sample..];
-        let text = self.transcribe_audio(window, sample_rate)?;
+        let mono_audio = std::mem::take(&mut self.samples);
+        let text = self.transcribe_audio(&mono_audio[start_sample..], sample_rate);
+        self.samples = mono_audio;
+        let text = text?;
         self.last_partial_samples = mono_samples;
         if text.trim().is_empty() || text == self.last_partial {
             return Ok(None);
@@ -171,22 +174,20 @@ impl SpeechRecStrategy for MoonshineBackend {
     }
 
     fn on_audio_end(&mut self) -> Result<Option<String>, String> {
-        let sample_rate = match self.sample_rate {
-            Some(rate) => rate,
+        let sample_rate = match self.format.get() {
+            Some((rate, _)) => rate,
             None => return Ok(None),
         };
-        let channels = match self.channels {
-            Some(channels) => channels,
-            None => return Ok(None),
-        };
-        if self.buffer.is_empty() {
+        if self.samples.is_empty() {
             return Ok(None);
         }
 
-        let mono_audio = to_mono_f32(&self.buffer, channels)?;
-        let text = self.transcribe_segments(&mono_audio, sample_rate)?;
+        let mono_audio = std::mem::take(&mut self.samples);
+        let text = self.transcribe_segments(&mono_audio, sample_rate);
+        self.samples = mono_audio;
+        let text = text?;
 
-        self.buffer.clear();
+        self.samples.clear();
         self.last_partial.clear();
         self.last_partial_samples = 0;
 
@@ -194,9 +195,8 @@ impl SpeechRecStrategy for MoonshineBackend {
     }
 
     fn reset(&mut self) {
-        self.buffer.clear();
-        self.sample_rate = None;
-        self.channels = None;
+        self.samples.clear();
+        self.format.clear();
         self.last_partial.clear();
         self.last_partial_samples = 0;
     }
@@ -226,6 +226,8 @@ pub fn init_moonshine_backend(config: &MoonshineConfig) -> Result<MoonshineBacke
     }
 
     let encoder = Session::builder()
+        .map_err(|err| err.to_string())?
+        .with_optimization_level(GraphOptimizationLevel::Level3)
         .map_err(|err| err.to_string())?
         .with_intra_threads(config.num_threads)
         .map_err(|err| err.to_string())?
@@ -233,6 +235,8 @@ pub fn init_moonshine_backend(config: &MoonshineConfig) -> Result<MoonshineBacke
         .map_err(|err| err.to_string())?;
 
     let decoder = Session::builder()
+        .map_err(|err| err.to_string())?
+        .with_optimization_level(GraphOptimizationLevel::Level3)
         .map_err(|err| err.to_string())?
         .with_intra_threads(config.num_threads)
         .map_err(|err| err.to_string())?
@@ -256,9 +260,8 @@ pub fn init_moonshine_backend(config: &MoonshineConfig) -> Result<MoonshineBacke
         decoder_inputs,
         decoder_input_types,
         tokenizer,
-        buffer: Vec::new(),
-        sample_rate: None,
-        channels: None,
+        samples: Vec::new(),
+        format: StreamFormat::default(),
         last_partial: String::new(),
         last_partial_samples: 0,
         model_spec,
@@ -279,27 +282,7 @@ impl MoonshineBackend {
                 channels
             ));
         }
-        if let Some(existing) = self.sample_rate {
-            if existing != sample_rate {
-                return Err(format!(
-                    "sample rate changed from {} to {}",
-                    existing, sample_rate
-                ));
-            }
-        } else {
-            self.sample_rate = Some(sample_rate);
-        }
-        if let Some(existing) = self.channels {
-            if existing != channels {
-                return Err(format!(
-                    "channel count changed from {} to {}",
-                    existing, channels
-                ));
-            }
-        } else {
-            self.channels = Some(channels);
-        }
-        Ok(())
+        self.format.lock(sample_rate, channels)
     }
 
     fn transcribe_segments(&mut self, audio: &[f32], sample_rate: u32) -> Result<String, String> {
@@ -628,39 +611,3 @@ fn session_input_types(session: &Session) -> HashMap<String, TensorElementType>
         .filter_map(|input| input.dtype().tensor_type().map(|ty| (input.name().to_string(), ty)))
         .collect()
 }
-
-fn to_mono_f32(audio: &[i16], channels: u16) -> Result<Vec<f32>, String> {
-    match channels {
-        1 => Ok(audio
-            .iter()
-            .map(|sample| *sample as f32 / i16::MAX as f32)
-            .collect()),
-        2 => {
-            let mut mono = Vec::with_capacity(audio.len() / 2);
-            for frame in audio.chunks_exact(2) {
-                let left = frame[0] as f32 / i16::MAX as f32;
-                let right = frame[1] as f32 / i16::MAX as f32;
-                mono.push((left + right) * 0.5);
-            }
-            Ok(mono)
-        }
-        _ => Err(format!(
-            "unsupported channel count {}; moonshine expects mono audio",
-            channels
-        )),
-    }
-}
-
-fn env_f32(key: &str, default: f32) -> f32 {
-    env::var(key)
-        .ok()
-        .and_then(|v| v.parse().ok())
-        .unwrap_or(default)
-}
-
-fn env_usize(key: &str, default: usize) -> usize {
-    env::var(key)
-        .ok()
-        .and_then(|v| v.parse().ok())
-        .unwrap_or(default)
-}
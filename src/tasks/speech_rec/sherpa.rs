@@ -3,13 +3,15 @@ use std::ptr;
 
 use sherpa_rs_sys as sys;
 
-use super::{SherpaConfig, SpeechRecStrategy};
+use super::{extend_mono_f32, SherpaConfig, SpeechRecStrategy};
 
 pub struct SherpaZipformerBackend {
     recognizer: *const sys::SherpaOnnxOnlineRecognizer,
     stream: *const sys::SherpaOnnxOnlineStream,
     sample_rate: u32,
     last_partial: String,
+    // Scratch buffer for the f32 samples handed to sherpa, reused per chunk.
+    samples: Vec<f32>,
 }
 
 impl SherpaZipformerBackend {
@@ -106,6 +108,7 @@ impl SherpaZipformerBackend {
             stream,
             sample_rate: config.sample_rate,
             last_partial: String::new(),
+            samples: Vec::new(),
         })
     }
 
@@ -134,14 +137,21 @@ impl SherpaZipformerBackend {
         Ok(text)
     }
 
-    fn accept_waveform(&self, audio: &[i16], sample_rate: u32, channels: u16) -> Result<(), String> {
+    fn accept_waveform(
+        &mut self,
+        audio: &[i16],
+        sample_rate: u32,
+        channels: u16,
+    ) -> Result<(), String> {
         if sample_rate != self.sample_rate {
             return Err(format!(
                 "unsupported sample rate {}; sherpa-onnx expects {}Hz",
                 sample_rate, self.sample_rate
             ));
         }
-        let samples = to_mono_f32(audio, channels)?;
+        let samples = &mut self.samples;
+        samples.clear();
+        extend_mono_f32(samples, audio, channels, "sherpa-onnx")?;
         if samples.is_empty() {
             return Ok(());
         }
@@ -259,28 +269,6 @@ fn to_optional_cstring(value: &str) -> Result<Option<CString>, String> {
         .map_err(|_| "SR_SHERPA_HOTWORDS_FILE contains an interior NUL byte".to_string())
 }
 
-fn to_mono_f32(audio: &[i16], channels: u16) -> Result<Vec<f32>, String> {
-    match channels {
-        1 => Ok(audio
-            .iter()
-            .map(|sample| *sample as f32 / i16::MAX as f32)
-            .collect()),
-        2 => {
-            let mut mono = Vec::with_capacity(audio.len() / 2);
-            for frame in audio.chunks_exact(2) {
-                let left = frame[0] as f32 / i16::MAX as f32;
-                let right = frame[1] as f32 / i16::MAX as f32;
-                mono.push((left + right) * 0.5);
-            }
-            Ok(mono)
-        }
-        _ => Err(format!(
-            "unsupported channel count {}; sherpa-onnx expects mono audio",
-            channels
-        )),
-    }
-}
-
 unsafe fn online_result_to_string(
     result: *const sys::SherpaOnnxOnlineRecognizerResult,
 ) -> String {
@@ -1,9 +1,11 @@
 use std::env;
 use std::path::Path;
 
-use whisper_rs::{FullParams, SamplingStrategy, WhisperContext, WhisperContextParameters};
+use whisper_rs::{
+    FullParams, SamplingStrategy, WhisperContext, WhisperContextParameters, WhisperState,
+};
 
-use super::{env_usize, SpeechRecStrategy};
+use super::{env_usize, SpeechRecStrategy, StreamFormat};
 use crate::model_download;
 
 #[derive(Debug, Clone)]
@@ -11,32 +13,43 @@ pub struct WhisperConfig {
     pub model: String,
     pub backend: String,
     pub threads: usize,
+    pub beam_size: usize,
 }
 
 impl WhisperConfig {
     pub fn from_env() -> Self {
-        let model = env::var("SR_WHISPER_MODEL").unwrap_or_else(|_| "base.en".to_string());
+        let model = env::var("SR_WHISPER_MODEL").unwrap_or_else(|_| "base.en-q8_0".to_string());
         let backend = env::var("SR_BACKEND").unwrap_or_else(|_| "cpu".to_string());
+        // Same default as whisper.cpp: past four threads decoding is limited by
+        // memory bandwidth, and extra threads only contend with audio I/O.
         let threads = env_usize(
             "SR_THREADS",
             std::thread::available_parallelism()
-                .map(|count| count.get())
+                .map(|count| count.get().min(4))
                 .unwrap_or(1),
         );
+        let beam_size = env_usize("SR_BEAM_SIZE", 1);
         Self {
             model,
             backend,
             threads,
+            beam_size,
         }
     }
 }
 
 pub struct WhisperBackend {
-    context: WhisperContext,
+    // One decoder state for the backend's lifetime; whisper resets its results
+    // on every full() call, so the mel/KV buffers are allocated once instead of
+    // per utterance. The state holds its own reference to the model context.
+    state: WhisperState,
     threads: usize,
+    beam_size: usize,
     buffer: Vec<i16>,
-    sample_rate: Option<u32>,
-    channels: Option<u16>,
+    // Float copy of `buffer` handed to whisper; kept across utterances so it
+    // only grows when an utterance is longer than any before it.
+    samples: Vec<f32>,
+    format: StreamFormat,
 }
 
 impl SpeechRecStrategy for WhisperBackend {
@@ -52,27 +65,22 @@ impl SpeechRecStrategy for WhisperBackend {
     }
 
     fn on_audio_end(&mut self) -> Result<Option<String>, String> {
-        let sample_rate = match self.sample_rate {
-            Some(rate) => rate,
-            None => return Ok(None),
-        };
-        let channels = match self.channels {
-            Some(channels) => channels,
+        let (sample_rate, channels) = match self.format.get() {
+            Some(format) => format,
             None => return Ok(None),
         };
         if self.buffer.is_empty() {
             return Ok(None);
         }
 
-        let text = self.transcribe(&self.buffer, sample_rate, channels)?;
+        let text = self.transcribe(sample_rate, channels)?;
         self.buffer.clear();
         Ok(Some(text))
     }
 
     fn reset(&mut self) {
         self.buffer.clear();
-        self.sample_rate = None;
-        self.channels = None;
+        self.format.clear();
     }
 }
 
@@ -101,12 +109,14 @@ pub fn init_whisper_backend(config: &WhisperConfig) -> Result<WhisperBackend, St
         WhisperContextParameters::default(),
     )
     .map_err(|err| err.to_string())?;
+    let state = context.create_state().map_err(|err| err.to_string())?;
     Ok(WhisperBackend {
-        context,
+        state,
         threads: config.threads,
+        beam_size: config.beam_size,
         buffer: Vec::new(),
-        sample_rate: None,
-        channels: None,
+        samples: Vec::new(),
+        format: StreamFormat::default(),
     })
 }
 
@@ -118,30 +128,10 @@ impl WhisperBackend {
                 sample_rate
             ));
         }
-        if let Some(existing) = self.sample_rate {
-            if existing != sample_rate {
-                return Err(format!(
-                    "sample rate changed from {} to {}",
-                    existing, sample_rate
-                ));
-            }
-        } else {
-            self.sample_rate = Some(sample_rate);
-        }
-        if let Some(existing) = self.channels {
-            if existing != channels {
-                return Err(format!(
-                    "channel count changed from {} to {}",
-                    existing, channels
-                ));
-            }
-        } else {
-            self.channels = Some(channels);
-        }
-        Ok(())
+        self.format.lock(sample_rate, channels)
     }
 
-    fn transcribe(&self, audio: &[i16], sample_rate: u32, channels: u16) -> Result<String, String> {
+    fn transcribe(&mut self, sample_rate: u32, channels: u16) -> Result<String, String> {
         if sample_rate != 16_000 {
             return Err(format!(
                 "unsupported sample rate {}; whisper-rs expects 16000Hz",
@@ -149,43 +139,63 @@ impl WhisperBackend {
             ));
         }
 
-        let mut float_audio = vec![0.0f32; audio.len()];
-        whisper_rs::convert_integer_to_float_audio(audio, &mut float_audio)
-            .map_err(|err| err.to_string())?;
-
-        let mono_audio = match channels {
-            1 => float_audio,
-            2 => whisper_rs::convert_stereo_to_mono_audio(&float_audio)
-                .map_err(|err| err.to_string())?,
+        let audio = &self.buffer;
+        let mono_audio = &mut self.samples;
+        mono_audio.clear();
+        match channels {
+            1 => {
+                mono_audio.resize(audio.len(), 0.0);
+                whisper_rs::convert_integer_to_float_audio(audio, mono_audio)
+                    .map_err(|err| err.to_string())?;
+            }
+            // Same scaling as convert_integer_to_float_audio followed by
+            // convert_stereo_to_mono_audio, without the stereo intermediate.
+            2 => mono_audio.extend(
+                audio
+                    .chunks_exact(2)
+                    .map(|frame| (frame[0] as f32 + frame[1] as f32) * (0.5 / 32768.0)),
+            ),
             _ => {
                 return Err(format!(
                     "unsupported channel count {}; whisper-rs expects mono audio",
                     channels
-                ))
+                ));
             }
-        };
+        }
 
         if mono_audio.is_empty() {
             return Err("no audio samples to transcribe".to_string());
         }
 
-        let mut state = self
-            .context
-            .create_state()
-            .map_err(|err| err.to_string())?;
-        let mut params = FullParams::new(SamplingStrategy::Greedy { best_of: 0 });
+        // Utterances are short and independent: decode greedily unless a beam
+        // is asked for, skip the temperature fallback re-decodes and don't
+        // prompt with the previous utterance the shared state remembers.
+        let strategy = if self.beam_size > 1 {
+            SamplingStrategy::BeamSearch {
+                beam_size: self.beam_size as i32,
+                patience: -1.0,
+            }
+        } else {
+            SamplingStrategy::Greedy { best_of: 1 }
+        };
+        let mut params = FullParams::new(strategy);
         params.set_n_threads(self.threads as i32);
+        params.set_no_context(true);
+        params.set_temperature(0.0);
+        params.set_temperature_inc(0.0);
+        params.set_no_timestamps(true);
+        params.set_no_speech_thold(0.6);
         params.set_print_special(false);
         params.set_print_progress(false);
         params.set_print_realtime(false);
         params.set_print_timestamps(false);
 
-        state
-            .full(params, &mono_audio)
+        self.state
+            .full(params, mono_audio)
             .map_err(|err| err.to_string())?;
 
         let mut text = String::new();
-        for segment in state.as_iter() {
+        for segment in self.state.as_iter() {
             let segment_text = segment.to_string();
             if segment_text.trim().is_empty() {
                 continue;
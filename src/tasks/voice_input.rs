@@ -1,14 +1,17 @@
 use std::env;
+use std::sync::atomic::{AtomicBool, Ordering};
 use std::sync::mpsc as std_mpsc;
+use std::sync::Arc;
 use std::time::Duration;
 
-use bytemuck::cast_slice;
 use cpal::traits::{DeviceTrait, HostTrait, StreamTrait};
 use tokio::fs;
-use tokio::sync::{broadcast, mpsc, watch};
+use tokio::sync::{mpsc, oneshot, watch};
 use tokio::time;
 
-use crate::protocol::{VoiceInputCommand, VoiceInputEvent};
+use crate::protocol::{
+    DEFAULT_STREAM_CHANNELS, DEFAULT_STREAM_SAMPLE_RATE, VoiceInputCommand, VoiceInputEvent,
+};
 use crate::watchdog::Heartbeat;
 
 #[derive(Debug, Clone)]
@@ -22,8 +25,8 @@ struct VoiceInputConfig {
 
 impl VoiceInputConfig {
     fn from_env() -> Self {
-        let stream_sample_rate = env_u32("STREAM_SAMPLE_RATE", 16_000);
-        let stream_channels = env_usize("STREAM_CHANNELS", 2);
+        let stream_sample_rate = env_u32("STREAM_SAMPLE_RATE", DEFAULT_STREAM_SAMPLE_RATE);
+        let stream_channels = env_usize("STREAM_CHANNELS", DEFAULT_STREAM_CHANNELS as usize);
         let chunk_size = env_usize("CHUNK_SIZE", 512);
         let capture_device = env::var("CAPTURE_DEVICE")
             .ok()
@@ -43,6 +46,8 @@ impl VoiceInputConfig {
 struct CaptureStream {
     receiver: mpsc::Receiver<Vec<f32>>,
     channels: usize,
+    active: Arc<AtomicBool>,
+    recycle: Option<std_mpsc::SyncSender<Vec<f32>>>,
     shutdown: Option<std_mpsc::Sender<()>>,
 }
 
@@ -50,6 +55,21 @@ impl CaptureStream {
     async fn next(&mut self) -> Option<Vec<f32>> {
         self.receiver.recv().await
     }
+
+    /// Gates the capture source; while inactive, frames are dropped before they are copied.
+    fn set_active(&mut self, active: bool) {
+        self.active.store(active, Ordering::Relaxed);
+        if !active {
+            while self.receiver.try_recv().is_ok() {}
+        }
+    }
+
+    /// Returns a consumed capture buffer so the device callback can refill it.
+    fn recycle(&self, buffer: Vec<f32>) {
+        if let Some(recycle) = &self.recycle {
+            let _ = recycle.try_send(buffer);
+        }
+    }
 }
 
 impl Drop for CaptureStream {
@@ -64,6 +84,8 @@ struct AudioPipeline {
     target_channels: usize,
     chunk_size: usize,
     pending: Vec<f32>,
+    // Channel-converted samples waiting to be resampled; reused across calls.
+    scratch: Vec<f32>,
     resampler: Option<LinearResampler>,
 }
 
@@ -78,45 +100,70 @@ impl AudioPipeline {
             target_channels,
             chunk_size,
             pending: Vec::new(),
+            scratch: Vec::new(),
             resampler,
         }
     }
 
-    fn push_samples(&mut self, input: &[f32], input_channels: usize) -> Vec<Vec<i16>> {
+    fn push_samples(&mut self, input: &[f32], input_channels: usize) -> Vec<Vec<u8>> {
         if input.is_empty() {
             return Vec::new();
         }
 
-        let mut output = convert_channels(input, input_channels, self.target_channels);
-        if let Some(resampler) = &mut self.resampler {
-            output = resampler.process(&output);
+        // Each stage writes straight into the next one's buffer; only a layout
+        // change that also needs resampling goes through the scratch buffer.
+        let same_layout = input_channels == self.target_channels;
+        match (&mut self.resampler, same_layout) {
+            (None, true) => self.pending.extend_from_slice(input),
+            (None, false) => convert_channels_into(
+                input,
+                input_channels,
+                self.target_channels,
+                &mut self.pending,
+            ),
+            (Some(resampler), true) => resampler.process_into(input, &mut self.pending),
+            (Some(resampler), false) => {
+                self.scratch.clear();
+                convert_channels_into(
+                    input,
+                    input_channels,
+                    self.target_channels,
+                    &mut self.scratch,
+                );
+                resampler.process_into(&self.scratch, &mut self.pending);
+            }
         }
-
-        self.pending.extend_from_slice(&output);
-        let mut chunks = Vec::new();
         let frame_size = self.target_channels;
         let target_samples = self.chunk_size * frame_size;
-
-        while self.pending.len() >= target_samples {
-            let chunk: Vec<f32> = self.pending.drain(..target_samples).collect();
-            chunks.push(f32_to_i16(&chunk));
+        if target_samples == 0 || self.pending.len() < target_samples {
+            return Vec::new();
         }
 
+        // Encode every complete chunk straight from `pending`, then shift the
+        // remainder down once rather than once per chunk.
+        let chunks: Vec<Vec<u8>> = self
+            .pending
+            .chunks_exact(target_samples)
+            .map(f32_to_pcm16)
+            .collect();
+        self.pending.drain(..chunks.len() * target_samples);
         chunks
     }
 
-    fn finish(&mut self) -> Option<Vec<i16>> {
+    fn finish(&mut self) -> Option<Vec<u8>> {
         if self.pending.is_empty() {
             return None;
         }
         let leftover = std::mem::take(&mut self.pending);
-        Some(f32_to_i16(&leftover))
+        Some(f32_to_pcm16(&leftover))
     }
 }
 
+/// Streaming linear interpolator. Only the last input frame is carried between
+/// calls, and output is appended to the caller's buffer, so steady-state
+/// processing does not allocate.
 struct LinearResampler {
-    input_rate: u32,
-    output_rate: u32,
+    step: f32,
     channels: usize,
     pos: f32,
     carry: Vec<f32>,
@@ -125,109 +172,139 @@ struct LinearResampler {
 impl LinearResampler {
     fn new(input_rate: u32, output_rate: u32, channels: usize) -> Self {
         Self {
-            input_rate,
-            output_rate,
+            step: input_rate as f32 / output_rate as f32,
             channels,
             pos: 0.0,
-            carry: Vec::new(),
+            carry: Vec::with_capacity(channels),
         }
     }
 
-    fn process(&mut self, input: &[f32]) -> Vec<f32> {
-        if input.is_empty() {
-            return Vec::new();
+    fn process_into(&mut self, input: &[f32], output: &mut Vec<f32>) {
+        let channels = self.channels;
+        let input_frames = input.len() / channels;
+        if input_frames == 0 {
+            return;
         }
 
-        let mut combined = Vec::with_capacity(self.carry.len() + input.len());
-        combined.extend_from_slice(&self.carry);
-        combined.extend_from_slice(input);
-
-        let total_frames = combined.len() / self.channels;
+        let carried = self.carry.len() / channels;
+        let total_frames = carried + input_frames;
         if total_frames < 2 {
-            self.carry = combined;
-            return Vec::new();
+            self.carry.clear();
+            self.carry.extend_from_slice(&input[..channels]);
+            return;
         }
 
-        let step = self.input_rate as f32 / self.output_rate as f32;
-        let mut output = Vec::new();
-        let mut pos = self.pos;
+        let carry = &self.carry[..];
+        let frame = |index: usize| -> &[f32] {
+            if index < carried {
+                carry
+            } else {
+                let start = (index - carried) * channels;
+                &input[start..start + channels]
+            }
+        };
 
-        while pos + 1.0 < total_frames as f32 {
-            let base = pos.floor() as usize;
+        let last_frame = (total_frames - 1) as f32;
+        let mut pos = self.pos;
+        if pos < last_frame {
+            let steps = ((last_frame - pos) / self.step).ceil() as usize;
+            output.reserve(steps * channels);
+        }
+        while pos < last_frame {
+            let base = pos as usize;
             let frac = pos - base as f32;
-            let idx0 = base * self.channels;
-            let idx1 = (base + 1) * self.channels;
-            for ch in 0..self.channels {
-                let s0 = combined[idx0 + ch];
-                let s1 = combined[idx1 + ch];
+            for (s0, s1) in frame(base).iter().zip(frame(base + 1)) {
                 output.push(s0 + (s1 - s0) * frac);
             }
-            pos += step;
+            pos += self.step;
         }
 
-        let max_keep_frame = total_frames.saturating_sub(1);
-        let mut keep_frame = pos.floor() as usize;
-        if keep_frame > max_keep_frame {
-            keep_frame = max_keep_frame;
-        }
-        let keep_index = keep_frame * self.channels;
-        self.carry = combined[keep_index..].to_vec();
+        // The interpolation position always ends at or past the last frame, so
+        // that frame is the only one the next call can still need.
+        let keep_frame = total_frames - 1;
+        let keep_start = (keep_frame - carried) * channels;
+        self.carry.clear();
+        self.carry.extend_from_slice(&input[keep_start..keep_start + channels]);
         self.pos = pos - keep_frame as f32;
-        output
     }
 }
 
-fn convert_channels(input: &[f32], input_channels: usize, output_channels: usize) -> Vec<f32> {
+/// Appends `input` re-laid out from `input_channels` to `output_channels`.
+fn convert_channels_into(
+    input: &[f32],
+    input_channels: usize,
+    output_channels: usize,
+    output: &mut Vec<f32>,
+) {
     if input_channels == output_channels {
-        return input.to_vec();
+        output.extend_from_slice(input);
+        return;
     }
 
-    let frames = input.len() / input_channels;
-    let mut output = Vec::with_capacity(frames * output_channels);
-
-    for frame in 0..frames {
-        let start = frame * input_channels;
-        let frame_slice = &input[start..start + input_channels];
-        if output_channels == 1 {
-            let sum: f32 = frame_slice.iter().copied().sum();
-            output.push(sum / input_channels as f32);
-        } else if output_channels == 2 {
-            match input_channels {
-                1 => {
-                    output.push(frame_slice[0]);
-                    output.push(frame_slice[0]);
-                }
-                _ => {
-                    output.push(frame_slice[0]);
-                    output.push(frame_slice[1]);
-                }
+    // One branch per call instead of per frame; every arm writes through
+    // exact-size iterators or a pre-sized slice, so the loops vectorize.
+    let frames = input.chunks_exact(input_channels);
+    match output_channels {
+        1 => {
+            // Divided rather than scaled by a reciprocal, so the average stays
+            // exact for channel counts like 3.
+            let count = input_channels as f32;
+            output.extend(frames.map(|frame| frame.iter().sum::<f32>() / count));
+        }
+        2 => {
+            // Mono is duplicated into both channels; wider input keeps its
+            // first two.
+            let right = input_channels.min(2) - 1;
+            let start = output.len();
+            output.resize(start + frames.len() * 2, 0.0);
+            for (pair, frame) in output[start..].chunks_exact_mut(2).zip(frames) {
+                pair[0] = frame[0];
+                pair[1] = frame[right];
+            }
+        }
+        _ => {
+            let keep = output_channels.min(input_channels);
+            output.reserve(frames.len() * keep);
+            for frame in frames {
+                output.extend_from_slice(&frame[..keep]);
             }
-        } else {
-            output.extend_from_slice(&frame_slice[..output_channels.min(input_channels)]);
         }
     }
-
-    output
 }
 
-fn f32_to_i16(input: &[f32]) -> Vec<i16> {
-    input
-        .iter()
-        .map(|sample| {
-            let scaled = (sample * i16::MAX as f32).round();
-            scaled.clamp(i16::MIN as f32, i16::MAX as f32) as i16
-        })
-        .collect()
+// Integer-to-float capture scales as reciprocals, so every conversion is a
+// single multiply instead of a divide per sample.
+const I16_TO_F32: f32 = 1.0 / i16::MAX as f32;
+const U16_TO_F32: f32 = 2.0 / u16::MAX as f32;
+const I32_TO_F32: f32 = 1.0 / i32::MAX as f32;
+// Capture buffers queued between the device callback and the task. The callback
+// drops frames when the queue is full, so keep enough headroom to ride out a
+// briefly busy runtime (32 device periods is a few hundred ms of audio).
+const CAPTURE_QUEUE_DEPTH: usize = 32;
+
+/// Converts samples straight into the native-endian s16 bytes carried by
+/// `VoiceInputEvent::AudioChunk`, without an intermediate `Vec<i16>`.
+///
+/// The output is sized up front and filled pairwise, and `as i16` already
+/// saturates, so the loop body has no capacity checks or clamps and the
+/// compiler can vectorize it.
+fn f32_to_pcm16(input: &[f32]) -> Vec<u8> {
+    let mut output = vec![0u8; input.len() * 2];
+    for (bytes, sample) in output.chunks_exact_mut(2).zip(input) {
+        let value = (sample * i16::MAX as f32).round() as i16;
+        bytes.copy_from_slice(&value.to_ne_bytes());
+    }
+    output
 }
 
 pub async fn run(
     mut rx: mpsc::Receiver<VoiceInputCommand>,
-    events: broadcast::Sender<VoiceInputEvent>,
+    events: mpsc::Sender<VoiceInputEvent>,
     heartbeat: Heartbeat,
     mut shutdown: watch::Receiver<bool>,
 ) {
     let config = VoiceInputConfig::from_env();
-    let (mut capture, mut pipeline) = match start_capture(&config) {
+    let (mut capture, mut pipeline) = match start_capture(&config).await {
         Ok(value) => value,
         Err(err) => {
             tracing::error!("voice input failed to start capture: {}", err);
@@ -242,7 +319,7 @@ pub async fn run(
         tokio::select! {
             _ = shutdown.changed() => {
                 if listening {
-                    flush_audio(&mut pipeline, &events);
+                    flush_audio(&mut pipeline, &events).await;
                 }
                 break;
             }
@@ -253,13 +330,15 @@ pub async fn run(
                 match command {
                     Some(VoiceInputCommand::StartListening) => {
                         listening = true;
+                        capture.set_active(true);
                         pipeline.pending.clear();
                     }
                     Some(VoiceInputCommand::StopListening) => {
                         if listening {
-                            flush_audio(&mut pipeline, &events);
+                            flush_audio(&mut pipeline, &events).await;
                         }
                         listening = false;
+                        capture.set_active(false);
                         pipeline.pending.clear();
                     }
                     Some(VoiceInputCommand::InjectAudioFile { path }) => {
@@ -271,7 +350,7 @@ pub async fn run(
                     }
                     Some(VoiceInputCommand::Shutdown) | None => {
                         if listening {
-                            flush_audio(&mut pipeline, &events);
+                            flush_audio(&mut pipeline, &events).await;
                         }
                         break;
                     }
@@ -282,12 +361,13 @@ pub async fn run(
                     if listening {
                         let chunks = pipeline.push_samples(&samples, capture.channels);
                         for chunk in chunks {
-                            send_chunk(&events, &chunk);
+                            send_chunk(&events, chunk).await;
                         }
                     }
+                    capture.recycle(samples);
                 } else {
                     if listening {
-                        flush_audio(&mut pipeline, &events);
+                        flush_audio(&mut pipeline, &events).await;
                     }
                     break;
                 }
@@ -296,15 +376,17 @@ pub async fn run(
     }
 }
 
-fn start_capture(
+async fn start_capture(
     config: &VoiceInputConfig,
 ) -> Result<(CaptureStream, AudioPipeline), String> {
     if let Some(mock_file) = &config.mock_file {
-        let (tx, rx) = mpsc::channel(8);
+        let (tx, rx) = mpsc::channel(CAPTURE_QUEUE_DEPTH);
+        let active = Arc::new(AtomicBool::new(false));
         let path = mock_file.clone();
         let chunk_frames = config.chunk_size;
+        let mock_active = active.clone();
         tokio::spawn(async move {
-            if let Err(err) = stream_mock_audio(&path, chunk_frames, tx).await {
+            if let Err(err) = stream_mock_audio(&path, chunk_frames, mock_active, tx).await {
                 tracing::warn!("mock audio stream error: {}", err);
             }
         });
@@ -322,38 +404,39 @@ fn start_capture(
             CaptureStream {
                 receiver: rx,
                 channels: spec.channels as usize,
+                active,
+                recycle: None,
                 shutdown: None,
             },
             pipeline,
         ))
     } else {
-        let (capture, pipeline) = start_live_capture(config)?;
+        let (capture, pipeline) = start_live_capture(config).await?;
         Ok((capture, pipeline))
     }
 }
 
-fn start_live_capture(
+async fn start_live_capture(
     config: &VoiceInputConfig,
 ) -> Result<(CaptureStream, AudioPipeline), String> {
-    let (tx, rx) = mpsc::channel(8);
-    let (info_tx, info_rx) = std_mpsc::channel();
+    let (tx, rx) = mpsc::channel(CAPTURE_QUEUE_DEPTH);
+    let (info_tx, info_rx) = oneshot::channel();
     let (shutdown_tx, shutdown_rx) = std_mpsc::channel();
+    let (recycle_tx, recycle_rx) = std_mpsc::sync_channel(CAPTURE_QUEUE_DEPTH);
+    let active = Arc::new(AtomicBool::new(false));
     let thread_config = config.clone();
+    let thread_active = active.clone();
 
     std::thread::spawn(move || {
-        match build_input_stream(&thread_config, tx) {
+        match build_input_stream(&thread_config, thread_active, recycle_rx, tx) {
             Ok((stream, info)) => {
                 if let Err(err) = stream.play() {
                     let _ = info_tx.send(Err(format!("failed to start input stream: {}", err)));
                     return;
                 }
                 let _ = info_tx.send(Ok(info));
-                loop {
-                    if shutdown_rx.try_recv().is_ok() {
-                        break;
-                    }
-                    std::thread::sleep(Duration::from_millis(200));
-                }
+                // Park until CaptureStream signals shutdown or is dropped.
+                let _ = shutdown_rx.recv();
                 drop(stream);
             }
             Err(err) => {
@@ -362,9 +445,12 @@ fn start_live_capture(
         }
     });
 
-    let info = info_rx
-        .recv_timeout(Duration::from_secs(2))
-        .map_err(|_| "timed out starting input stream".to_string())??;
+    // The device is opened on the capture thread; wait for it without
+    // holding a runtime worker.
+    let info = time::timeout(Duration::from_secs(2), info_rx)
+        .await
+        .map_err(|_| "timed out starting input stream".to_string())?
+        .map_err(|_| "input stream thread exited".to_string())??;
 
     let pipeline = AudioPipeline::new(
         info.sample_rate,
@@ -385,6 +471,8 @@ fn start_live_capture(
         CaptureStream {
             receiver: rx,
             channels: info.channels,
+            active,
+            recycle: Some(recycle_tx),
             shutdown: Some(shutdown_tx),
         },
         pipeline,
@@ -398,26 +486,44 @@ struct CaptureInfo {
 
 fn build_input_stream(
     config: &VoiceInputConfig,
+    active: Arc<AtomicBool>,
+    pool: std_mpsc::Receiver<Vec<f32>>,
     tx: mpsc::Sender<Vec<f32>>,
 ) -> Result<(cpal::Stream, CaptureInfo), String> {
     let host = cpal::default_host();
 
-    let available_devices = host
+    // Enumerating ALSA devices probes every PCM, so list them (and their names) once.
+    let devices: Vec<(cpal::Device, Option<String>)> = host
         .input_devices()
         .map_err(|err| format!("failed to list input devices: {}", err))?
-        .map(|d| d.name().unwrap_or("unknown".to_string()))
+        .map(|device| {
+            let name = device.name().ok();
+            (device, name)
+        })
+        .collect();
+    let available_devices = devices
+        .iter()
+        .map(|(_, name)| name.as_deref().unwrap_or("unknown"))
         .collect::<Vec<_>>();
     tracing::info!("available input devices: {:?}", available_devices);
-    
-    let device = match &config.capture_device {
-        Some(name) => host
-            .input_devices()
-            .map_err(|err| format!("failed to list input devices: {}", err))?
-            .find(|device| device.name().map(|n| n.contains(name)).unwrap_or(false))
+
+    let (device, device_name) = match &config.capture_device {
+        Some(name) => devices
+            .into_iter()
+            .find(|(_, device_name)| {
+                device_name
+                    .as_deref()
+                    .map(|n| n.contains(name.as_str()))
+                    .unwrap_or(false)
+            })
             .ok_or_else(|| format!("input device '{}' not found.", name))?,
-        None => host
-            .default_input_device()
-            .ok_or_else(|| "no default input device available".to_string())?,
+        None => {
+            let device = host
+                .default_input_device()
+                .ok_or_else(|| "no default input device available".to_string())?;
+            let name = device.name().ok();
+            (device, name)
+        }
     };
 
     let default_config = device
@@ -434,7 +540,7 @@ fn build_input_stream(
     // Print chosen device and config
     tracing::info!(
         "using input device: '{}' with config: {:?}",
-        device.name().unwrap_or("unknown".to_string()),
+        device_name.as_deref().unwrap_or("unknown"),
         stream_config
     );
 
@@ -445,7 +551,12 @@ fn build_input_stream(
             .build_input_stream(
                 &stream_config,
                 move |data: &[f32], _| {
-                    let _ = tx.try_send(data.to_vec());
+                    if !active.load(Ordering::Relaxed) {
+                        return;
+                    }
+                    let mut buffer = pooled_buffer(&pool, data.len());
+                    buffer.extend_from_slice(data);
+                    let _ = tx.try_send(buffer);
                 },
                 err_fn,
                 None,
@@ -455,9 +566,12 @@ fn build_input_stream(
             .build_input_stream(
                 &stream_config,
                 move |data: &[i16], _| {
-                    let converted: Vec<f32> =
-                        data.iter().map(|sample| *sample as f32 / i16::MAX as f32).collect();
-                    let _ = tx.try_send(converted);
+                    if !active.load(Ordering::Relaxed) {
+                        return;
+                    }
+                    let mut buffer = pooled_buffer(&pool, data.len());
+                    buffer.extend(data.iter().map(|sample| *sample as f32 * I16_TO_F32));
+                    let _ = tx.try_send(buffer);
                 },
                 err_fn,
                 None,
@@ -467,11 +581,12 @@ fn build_input_stream(
             .build_input_stream(
                 &stream_config,
                 move |data: &[u16], _| {
-                    let converted: Vec<f32> = data
-                        .iter()
-                        .map(|sample| (*sample as f32 / u16::MAX as f32) * 2.0 - 1.0)
-                        .collect();
-                    let _ = tx.try_send(converted);
+                    if !active.load(Ordering::Relaxed) {
+                        return;
+                    }
+                    let mut buffer = pooled_buffer(&pool, data.len());
+                    buffer.extend(data.iter().map(|sample| *sample as f32 * U16_TO_F32 - 1.0));
+                    let _ = tx.try_send(buffer);
                 },
                 err_fn,
                 None,
@@ -481,9 +596,12 @@ fn build_input_stream(
             .build_input_stream(
                 &stream_config,
                 move |data: &[i32], _| {
-                    let converted: Vec<f32> =
-                        data.iter().map(|sample| *sample as f32 / i32::MAX as f32).collect();
-                    let _ = tx.try_send(converted);
+                    if !active.load(Ordering::Relaxed) {
+                        return;
+                    }
+                    let mut buffer = pooled_buffer(&pool, data.len());
+                    buffer.extend(data.iter().map(|sample| *sample as f32 * I32_TO_F32));
+                    let _ = tx.try_send(buffer);
                 },
                 err_fn,
                 None,
@@ -503,6 +621,14 @@ fn build_input_stream(
     ))
 }
 
+/// Takes a recycled buffer from the run loop, allocating only when none is free.
+fn pooled_buffer(pool: &std_mpsc::Receiver<Vec<f32>>, len: usize) -> Vec<f32> {
+    let mut buffer = pool.try_recv().unwrap_or_default();
+    buffer.clear();
+    buffer.reserve(len);
+    buffer
+}
+
 fn pick_input_config(device: &cpal::Device, target_rate: u32) -> Option<cpal::SupportedStreamConfig> {
     let mut configs = device.supported_input_configs().ok()?;
     configs.find_map(|config| {
@@ -523,7 +649,7 @@ fn pick_input_config(device: &cpal::Device, target_rate: u32) -> Option<cpal::Su
 
 async fn inject_audio_file(
     config: &VoiceInputConfig,
-    events: &broadcast::Sender<VoiceInputEvent>,
+    events: &mpsc::Sender<VoiceInputEvent>,
     path: &str,
 ) -> Result<(), String> {
     let bytes = fs::read(path)
@@ -532,68 +658,75 @@ async fn inject_audio_file(
     let mut reader =
         hound::WavReader::new(std::io::Cursor::new(bytes)).map_err(|err| err.to_string())?;
     let spec = reader.spec();
+    let channels = spec.channels as usize;
+    let chunk_samples = config.chunk_size * channels;
 
     let mut pipeline = AudioPipeline::new(
         spec.sample_rate,
-        spec.channels as usize,
+        channels,
         config.stream_sample_rate,
         config.stream_channels,
         config.chunk_size,
     );
-    let mut scratch = Vec::new();
-    let sleep_ms = ((config.chunk_size as f32 / spec.sample_rate as f32) * 1000.0).max(1.0);
+    let mut scratch = Vec::with_capacity(chunk_samples);
+    let mut pacer = chunk_pacer(config.chunk_size, spec.sample_rate).await;
     for sample in reader.samples::<i16>() {
         let sample = sample.map_err(|err| err.to_string())?;
-        scratch.push(sample as f32 / i16::MAX as f32);
-        if scratch.len() >= config.chunk_size * spec.channels as usize {
-            let chunks = pipeline.push_samples(&scratch, spec.channels as usize);
+        scratch.push(sample as f32 * I16_TO_F32);
+        if scratch.len() >= chunk_samples {
+            let chunks = pipeline.push_samples(&scratch, channels);
             for chunk in chunks {
-                send_chunk(events, &chunk);
+                send_chunk(events, chunk).await;
             }
             scratch.clear();
-            tokio::time::sleep(Duration::from_millis(sleep_ms as u64)).await;
+            pacer.tick().await;
         }
     }
 
     if !scratch.is_empty() {
-        let chunks = pipeline.push_samples(&scratch, spec.channels as usize);
+        let chunks = pipeline.push_samples(&scratch, channels);
         for chunk in chunks {
-            send_chunk(events, &chunk);
+            send_chunk(events, chunk).await;
         }
     }
 
     if let Some(leftover) = pipeline.finish() {
-        send_chunk(events, &leftover);
+        send_chunk(events, leftover).await;
     }
-    let _ = events.send(VoiceInputEvent::AudioEnded);
+    let _ = events.send(VoiceInputEvent::AudioEnded).await;
     Ok(())
 }
 
 async fn stream_mock_audio(
     path: &str,
     chunk_frames: usize,
+    active: Arc<AtomicBool>,
     sender: mpsc::Sender<Vec<f32>>,
 ) -> Result<(), String> {
     let bytes = fs::read(path)
         .await
         .map_err(|err| format!("failed to read {}: {}", path, err))?;
-    let mut reader =
-        hound::WavReader::new(std::io::Cursor::new(bytes)).map_err(|err| err.to_string())?;
-    let spec = reader.spec();
-    let sleep_ms = ((chunk_frames as f32 / spec.sample_rate as f32) * 1000.0).max(1.0);
-
-    let mut samples = Vec::new();
-    for sample in reader.samples::<i16>() {
-        let sample = sample.map_err(|err| err.to_string())?;
-        samples.push(sample as f32 / i16::MAX as f32);
-    }
+    // Decoding a long file is CPU-bound; keep it off the runtime workers that
+    // drive the audio and command tasks.
+    let (spec, samples) = tokio::task::spawn_blocking(move || decode_mock_wav(bytes))
+        .await
+        .map_err(|err| err.to_string())??;
 
     if samples.is_empty() {
         return Ok(());
     }
 
+    let chunk_samples = chunk_frames * spec.channels as usize;
+    let mut pacer = chunk_pacer(chunk_frames, spec.sample_rate).await;
     loop {
-        for chunk in samples.chunks(chunk_frames * spec.channels as usize) {
+        for chunk in samples.chunks(chunk_samples) {
+            if !active.load(Ordering::Relaxed) {
+                if sender.is_closed() {
+                    return Ok(());
+                }
+                pacer.tick().await;
+                continue;
+            }
             match sender.try_send(chunk.to_vec()) {
                 Ok(()) => {}
                 Err(mpsc::error::TrySendError::Closed(_)) => {
@@ -603,11 +736,35 @@ async fn stream_mock_audio(
                     tracing::debug!("mock audio frame dropped");
                 }
             }
-            tokio::time::sleep(Duration::from_millis(sleep_ms as u64)).await;
+            pacer.tick().await;
         }
     }
 }
 
+fn decode_mock_wav(bytes: Vec<u8>) -> Result<(hound::WavSpec, Vec<f32>), String> {
+    let mut reader =
+        hound::WavReader::new(std::io::Cursor::new(bytes)).map_err(|err| err.to_string())?;
+    let spec = reader.spec();
+
+    let mut samples = Vec::with_capacity(reader.len() as usize);
+    for sample in reader.samples::<i16>() {
+        let sample = sample.map_err(|err| err.to_string())?;
+        samples.push(sample as f32 * I16_TO_F32);
+    }
+    Ok((spec, samples))
+}
+
+/// Paces file-backed audio at real time against fixed deadlines, so per-chunk
+/// processing time and timer rounding do not accumulate as drift.
+async fn chunk_pacer(chunk_frames: usize, sample_rate: u32) -> time::Interval {
+    let period = Duration::from_secs_f64(chunk_frames as f64 / sample_rate.max(1) as f64)
+        .max(Duration::from_millis(1));
+    let mut pacer = time::interval(period);
+    // The first tick completes immediately; consume it so the next one is a full period away.
+    pacer.tick().await;
+    pacer
+}
+
 fn env_u32(key: &str, default: u32) -> u32 {
     env::var(key).ok().and_then(|v| v.parse().ok()).unwrap_or(default)
 }
@@ -616,16 +773,16 @@ fn env_usize(key: &str, default: usize) -> usize {
     env::var(key).ok().and_then(|v| v.parse().ok()).unwrap_or(default)
 }
 
-fn send_chunk(events: &broadcast::Sender<VoiceInputEvent>, chunk: &[i16]) {
+async fn send_chunk(events: &mpsc::Sender<VoiceInputEvent>, chunk: Vec<u8>) {
     if chunk.is_empty() {
         return;
     }
-    let _ = events.send(VoiceInputEvent::AudioChunk(cast_slice(chunk).to_vec()));
+    let _ = events.send(VoiceInputEvent::AudioChunk(chunk)).await;
 }
 
-fn flush_audio(pipeline: &mut AudioPipeline, events: &broadcast::Sender<VoiceInputEvent>) {
+async fn flush_audio(pipeline: &mut AudioPipeline, events: &mpsc::Sender<VoiceInputEvent>) {
     if let Some(leftover) = pipeline.finish() {
-        send_chunk(events, &leftover);
+        send_chunk(events, leftover).await;
     }
-    let _ = events.send(VoiceInputEvent::AudioEnded);
+    let _ = events.send(VoiceInputEvent::AudioEnded).await;
 }
@@ -12,51 +12,36 @@ use rodio::buffer::SamplesBuffer;
 use rodio::mixer::Mixer;
 use rodio::source::{SineWave, Zero};
 use rodio::{Decoder, OutputStream, OutputStreamBuilder, Sink, Source};
+use tokio::runtime::Handle;
 use tokio::sync::{broadcast, mpsc, watch};
 
 use crate::protocol::{AudioOutput, AudioStreamFormat, VoiceOutputCommand, VoiceOutputEvent};
 
 const START_SILENCE_MS: u64 = 50;
+/// Already-decoded MP3 bytes kept behind the read position so the decoder can
+/// still seek back a little; anything older is released as playback advances.
+const MP3_STREAM_KEEP_BYTES: usize = 64 * 1024;
 
 pub async fn run(
-    mut rx: mpsc::Receiver<VoiceOutputCommand>,
+    rx: mpsc::Receiver<VoiceOutputCommand>,
     events: broadcast::Sender<VoiceOutputEvent>,
     mut shutdown: watch::Receiver<bool>,
 ) {
-    let playback_generation = Arc::new(AtomicU64::new(0));
-    let (tx, thread_rx) = std_mpsc::channel();
-    let thread_events = events.clone();
-    let thread_generation = Arc::clone(&playback_generation);
-    std::thread::spawn(move || output_loop(thread_rx, thread_events, thread_generation));
-
-    loop {
-        tokio::select! {
-            _ = shutdown.changed() => {
-                let _ = tx.send(VoiceOutputCommand::Shutdown);
-                break;
-            }
-            command = rx.recv() => {
-                match command {
-                    Some(command) => {
-                        if tx.send(command).is_err() {
-                            break;
-                        }
-                    }
-                    None => {
-                        let _ = tx.send(VoiceOutputCommand::Shutdown);
-                        break;
-                    }
-                }
-            }
-        }
-    }
+    // The output thread consumes the command channel itself, so stream chunks go
+    // straight to rodio instead of being relayed through a forwarding task.
+    let thread_shutdown = shutdown.clone();
+    let runtime = Handle::current();
+    std::thread::spawn(move || output_loop(rx, events, thread_shutdown, runtime));
+    let _ = shutdown.changed().await;
 }
 
 fn output_loop(
-    rx: std_mpsc::Receiver<VoiceOutputCommand>,
+    mut rx: mpsc::Receiver<VoiceOutputCommand>,
     events: broadcast::Sender<VoiceOutputEvent>,
-    playback_generation: Arc<AtomicU64>,
+    mut shutdown: watch::Receiver<bool>,
+    runtime: Handle,
 ) {
+    let playback_generation = Arc::new(AtomicU64::new(0));
     let stream = match open_output_stream() {
         Ok(value) => value,
         Err(err) => {
@@ -65,10 +50,29 @@ fn output_loop(
         }
     };
     let handle = stream.mixer();
+    let finish_watcher = FinishWatcher::spawn(events.clone(), Arc::clone(&playback_generation));
     let mut current_sink: Option<Arc<Sink>> = None;
     let mut current_stream: Option<StreamState> = None;
 
-    while let Ok(command) = rx.recv() {
+    // A command pulled off the channel while draining stream chunks.
+    let mut deferred: Option<VoiceOutputCommand> = None;
+
+    loop {
+        let next = match deferred.take() {
+            Some(command) => Some(command),
+            // The orchestrator keeps its sender open, so shutdown has to wake
+            // this wait itself rather than rely on the channel closing.
+            None => runtime.block_on(async {
+                tokio::select! {
+                    command = rx.recv() => command,
+                    _ = shutdown.changed() => None,
+                }
+            }),
+        };
+        let command = match next {
+            Some(command) if !*shutdown.borrow() => command,
+            _ => VoiceOutputCommand::Shutdown,
+        };
         match command {
                 VoiceOutputCommand::PlayText { text } => {
                     stop_stream(&mut current_stream);
@@ -76,12 +80,7 @@ fn output_loop(
                     let generation = next_generation(&playback_generation);
                     play_beep(&handle, &mut current_sink);
                     if let Some(sink) = current_sink.as_ref() {
-                        spawn_sink_finish_thread(
-                            Arc::clone(sink),
-                            events.clone(),
-                            Arc::clone(&playback_generation),
-                            generation,
-                        );
+                        finish_watcher.watch(Arc::clone(sink), generation);
                     }
                     tracing::info!("voice output: {}", text);
                 }
@@ -92,12 +91,7 @@ fn output_loop(
                     match play_audio_file(&handle, &path) {
                         Ok(sink) => {
                             let sink = Arc::new(sink);
-                            spawn_sink_finish_thread(
-                                Arc::clone(&sink),
-                                events.clone(),
-                                Arc::clone(&playback_generation),
-                                generation,
-                            );
+                            finish_watcher.watch(Arc::clone(&sink), generation);
                             current_sink = Some(sink);
                             tracing::info!("voice output audio file: {}", path);
                         }
@@ -113,12 +107,7 @@ fn output_loop(
                     match play_audio(&handle, audio) {
                         Ok(sink) => {
                             let sink = Arc::new(sink);
-                            spawn_sink_finish_thread(
-                                Arc::clone(&sink),
-                                events.clone(),
-                                Arc::clone(&playback_generation),
-                                generation,
-                            );
+                            finish_watcher.watch(Arc::clone(&sink), generation);
                             current_sink = Some(sink);
                             tracing::info!("voice output: audio buffer");
                         }
@@ -134,6 +123,7 @@ fn output_loop(
                     match start_stream(
                         &handle,
                         format,
+                        &finish_watcher,
                         events.clone(),
                         Arc::clone(&playback_generation),
                         generation,
@@ -147,7 +137,20 @@ fn output_loop(
                         }
                     }
                 }
-                VoiceOutputCommand::StreamChunk { data } => {
+                VoiceOutputCommand::StreamChunk { mut data } => {
+                    // Take every chunk already queued behind this one in the same
+                    // wakeup, so a backlog reaches the decoder as one push.
+                    while let Ok(next) = rx.try_recv() {
+                        match next {
+                            VoiceOutputCommand::StreamChunk { data: more } => {
+                                data.extend_from_slice(&more);
+                            }
+                            other => {
+                                deferred = Some(other);
+                                break;
+                            }
+                        }
+                    }
                     if let Some(stream) = &mut current_stream {
                         if let Err(err) = stream.push(data) {
                             tracing::warn!("voice output stream error: {}", err);
@@ -181,19 +184,37 @@ fn next_generation(playback_generation: &Arc<AtomicU64>) -> u64 {
     playback_generation.fetch_add(1, Ordering::SeqCst) + 1
 }
 
-fn spawn_sink_finish_thread(
-    sink: Arc<Sink>,
-    events: broadcast::Sender<VoiceOutputEvent>,
-    playback_generation: Arc<AtomicU64>,
-    generation: u64,
-) {
-    std::thread::spawn(move || {
-        sink.sleep_until_end();
-        if playback_generation.load(Ordering::SeqCst) == generation {
-            let _ = events.send(VoiceOutputEvent::Finished);
-        }
-    });
+/// Reports `Finished` for completed sinks from one long-lived thread instead of
+/// spawning a waiter thread per playback.
+#[derive(Clone)]
+struct FinishWatcher {
+    tx: std_mpsc::Sender<(Arc<Sink>, u64)>,
+}
+
+impl FinishWatcher {
+    fn spawn(
+        events: broadcast::Sender<VoiceOutputEvent>,
+        playback_generation: Arc<AtomicU64>,
+    ) -> Self {
+        let (tx, rx) = std_mpsc::channel::<(Arc<Sink>, u64)>();
+        std::thread::spawn(move || {
+            // Every new playback stops the previous sink first, so sinks finish in
+            // the order they are queued here.
+            while let Ok((sink, generation)) = rx.recv() {
+                sink.sleep_until_end();
+                if playback_generation.load(Ordering::SeqCst) == generation {
+                    let _ = events.send(VoiceOutputEvent::Finished);
+                }
+            }
+        });
+        Self { tx }
+    }
+
+    fn watch(&self, sink: Arc<Sink>, generation: u64) {
+        let _ = self.tx.send((sink, generation));
+    }
 }
+
 fn play_audio_file(handle: &Mixer, path: &str) -> Result<Sink, String> {
     let file = File::open(path).map_err(|err| format!("open failed: {}", err))?;
     let reader = BufReader::new(file);
@@ -207,19 +228,14 @@ fn play_audio_file(handle: &Mixer, path: &str) -> Result<Sink, String> {
 fn play_audio(handle: &Mixer, audio: AudioOutput) -> Result<Sink, String> {
     match audio {
         AudioOutput::Pcm {
-            mut data,
+            data,
             sample_rate,
             channels,
         } => {
-            let aligned_len = data.len() - (data.len() % 2);
-            data.truncate(aligned_len);
-            if data.is_empty() {
+            let samples = pcm16_to_f32(&data);
+            if samples.is_empty() {
                 return Err("pcm buffer is empty".to_string());
             }
-            let samples: Vec<f32> = bytemuck::cast_slice(&data)
-                .iter()
-                .map(|&s: &f32| s as f32 / 32768.0)
-                .collect();
             let source = SamplesBuffer::new(channels, sample_rate, samples);
             let sink = Sink::connect_new(handle);
             sink.append(source);
@@ -230,8 +246,8 @@ fn play_audio(handle: &Mixer, audio: AudioOutput) -> Result<Sink, String> {
             if data.is_empty() {
                 return Err("mp3 buffer is empty".to_string());
             }
-            let reader = BufReader::new(Cursor::new(data));
-            let decoder = Decoder::new(reader).map_err(|err| format!("decode failed: {}", err))?;
+            // Already in memory; the decoder's own read buffer is enough.
+            let decoder = Decoder::new(Cursor::new(data)).map_err(|err| format!("decode failed: {}", err))?;
             let sample_rate = decoder.sample_rate();
             let channels = decoder.channels();
             tracing::info!(
@@ -239,8 +255,9 @@ fn play_audio(handle: &Mixer, audio: AudioOutput) -> Result<Sink, String> {
                 sample_rate,
                 channels
             );
-            let stereo_samples: Vec<f32> = mono_then_stereo(decoder, channels)?.collect();
-            let source = SamplesBuffer::new(2, sample_rate, stereo_samples);
+            // Decode lazily inside the sink so playback starts after the first
+            // frame instead of after the whole clip has been decoded.
+            let source = mono_then_stereo(decoder, channels)?;
             let sink = Sink::connect_new(handle);
             sink.append(source);
             sink.play();
@@ -264,11 +281,11 @@ enum StreamState {
         /// Minimum buffered bytes before pushing PCM to the sink.
         min_bytes: usize,
         timings: Arc<Mutex<StreamTimings>>,
-        events: broadcast::Sender<VoiceOutputEvent>,
-        playback_generation: Arc<AtomicU64>,
+        finish_watcher: FinishWatcher,
         generation: u64,
     },
     Mp3 {
+        sink: Arc<Sink>,
         tx: std_mpsc::Sender<StreamMessage>,
         stop: Arc<AtomicBool>,
         /// Accumulates early chunks until `min_bytes` is reached to prime the decoder.
@@ -314,10 +331,15 @@ impl StreamState {
                 log_total_playback("pcm", timings, true);
             }
             StreamState::Mp3 {
-                tx, stop, timings, ..
+                sink,
+                tx,
+                stop,
+                timings,
+                ..
             } => {
                 stop.store(true, Ordering::SeqCst);
                 let _ = tx.send(StreamMessage::End);
+                sink.stop();
                 log_total_playback("mp3", timings, true);
             }
         }
@@ -331,22 +353,16 @@ impl StreamState {
                 channels,
                 pending,
                 timings,
-                events,
-                playback_generation,
+                finish_watcher,
                 generation,
                 ..
             } => {
                 if !pending.is_empty() {
-                    let chunk = std::mem::take(pending);
-                    let _ = push_pcm_chunk(sink.as_ref(), chunk, *sample_rate, *channels);
+                    let _ = push_pcm_chunk(sink.as_ref(), pending, *sample_rate, *channels);
+                    pending.clear();
                 }
                 log_total_playback("pcm", Arc::clone(timings), false);
-                spawn_sink_finish_thread(
-                    Arc::clone(sink),
-                    events.clone(),
-                    Arc::clone(playback_generation),
-                    *generation,
-                );
+                finish_watcher.watch(Arc::clone(sink), *generation);
             }
             StreamState::Mp3 { tx, pending, .. } => {
                 if !pending.is_empty() {
@@ -368,6 +384,7 @@ impl StreamState {
 fn start_stream(
     handle: &Mixer,
     format: AudioStreamFormat,
+    finish_watcher: &FinishWatcher,
     events: broadcast::Sender<VoiceOutputEvent>,
     playback_generation: Arc<AtomicU64>,
     generation: u64,
@@ -391,8 +408,7 @@ fn start_stream(
                     sample_rate,
                     channels,
                 ))))),
-                events,
-                playback_generation,
+                finish_watcher: finish_watcher.clone(),
                 generation,
             })
         }
@@ -400,14 +416,18 @@ fn start_stream(
             let (tx, rx) = std_mpsc::channel();
             let stop = Arc::new(AtomicBool::new(false));
             let timings = Arc::new(Mutex::new(StreamTimings::new(None)));
-            let thread_handle = handle.clone();
+            // Created here so `stop` can halt playback directly; the thread only
+            // appends the decoded stream to it.
+            let sink = Arc::new(Sink::connect_new(handle));
+            sink.play();
+            let thread_sink = Arc::clone(&sink);
             let thread_stop = Arc::clone(&stop);
             let thread_timings = Arc::clone(&timings);
             let thread_events = events.clone();
             let thread_generation = Arc::clone(&playback_generation);
             std::thread::spawn(move || {
                 run_mp3_stream(
-                    &thread_handle,
+                    thread_sink,
                     rx,
                     thread_stop,
                     thread_timings,
@@ -417,6 +437,7 @@ fn start_stream(
                 )
             });
             Ok(StreamState::Mp3 {
+                sink,
                 tx,
                 stop,
                 pending: Vec::new(),
@@ -460,22 +481,26 @@ fn push_pcm_buffered(
     sample_rate: u32,
     channels: u16,
 ) -> Result<(), String> {
-    if !data.is_empty() {
-        pending.extend_from_slice(&data);
+    let frame_bytes = 2usize.saturating_mul(channels.max(1) as usize);
+    if pending.is_empty() && data.len() >= min_bytes {
+        // Usual case once playback is going: decode straight from the chunk
+        // and carry over only a trailing partial frame.
+        let aligned_len = data.len() - (data.len() % frame_bytes);
+        pending.extend_from_slice(&data[aligned_len..]);
+        return push_pcm_chunk(sink, &data[..aligned_len], sample_rate, channels);
     }
+
+    pending.extend_from_slice(&data);
     if pending.len() < min_bytes {
         return Ok(());
     }
-    let frame_bytes = 2usize.saturating_mul(channels.max(1) as usize);
-    if frame_bytes == 0 {
-        return Ok(());
-    }
     let aligned_len = pending.len() - (pending.len() % frame_bytes);
     if aligned_len == 0 {
         return Ok(());
     }
-    let chunk: Vec<u8> = pending.drain(..aligned_len).collect();
-    push_pcm_chunk(sink, chunk, sample_rate, channels)
+    let result = push_pcm_chunk(sink, &pending[..aligned_len], sample_rate, channels);
+    pending.drain(..aligned_len);
+    result
 }
 
 fn push_mp3_buffered(
@@ -495,29 +520,30 @@ fn push_mp3_buffered(
         .map_err(|_| "mp3 stream closed".to_string())
 }
 
-fn push_pcm_chunk(
-    sink: &Sink,
-    mut data: Vec<u8>,
-    sample_rate: u32,
-    channels: u16,
-) -> Result<(), String> {
-    let aligned_len = data.len() - (data.len() % 2);
-    data.truncate(aligned_len);
-    if data.is_empty() {
+fn push_pcm_chunk(sink: &Sink, data: &[u8], sample_rate: u32, channels: u16) -> Result<(), String> {
+    let samples = pcm16_to_f32(data);
+    if samples.is_empty() {
         return Ok(());
     }
-    let samples: Vec<f32> = bytemuck::cast_slice(&data)
-        .iter()
-        .map(|&s: &f32| s as f32 / 32768.0)
-        .collect();
     let source = SamplesBuffer::new(channels, sample_rate, samples);
     sink.append(source);
     Ok(())
 }
 
+/// Decodes s16le PCM into rodio samples in one pass. A trailing odd byte is
+/// ignored.
+fn pcm16_to_f32(data: &[u8]) -> Vec<f32> {
+    const SCALE: f32 = 1.0 / 32768.0;
+    data.chunks_exact(2)
+        .map(|pair| i16::from_le_bytes([pair[0], pair[1]]) as f32 * SCALE)
+        .collect()
+}
+
 struct Mp3StreamReader {
     rx: Arc<Mutex<std_mpsc::Receiver<StreamMessage>>>,
     cursor: Cursor<Vec<u8>>,
+    /// Stream offset of the first byte still held in `cursor`.
+    base: u64,
     ended: bool,
 }
 
@@ -530,29 +556,49 @@ impl Mp3StreamReader {
         Self {
             rx,
             cursor: Cursor::new(buffer),
+            base: 0,
             ended,
         }
     }
+
+    /// Drops consumed bytes beyond the seek-back window so a long reply does
+    /// not stay resident for the whole stream.
+    fn release_consumed(&mut self) {
+        let pos = self.cursor.position() as usize;
+        if pos < MP3_STREAM_KEEP_BYTES * 2 {
+            return;
+        }
+        let drop_len = pos - MP3_STREAM_KEEP_BYTES;
+        self.cursor.get_mut().drain(..drop_len);
+        self.cursor.set_position(MP3_STREAM_KEEP_BYTES as u64);
+        self.base += drop_len as u64;
+    }
 }
 
 impl Read for Mp3StreamReader {
     fn read(&mut self, out: &mut [u8]) -> std::io::Result<usize> {
         while self.cursor.position() as usize >= self.cursor.get_ref().len() && !self.ended {
-            let message = {
-                let rx = self
-                    .rx
-                    .lock()
-                    .map_err(|_| std::io::Error::new(std::io::ErrorKind::Other, "rx poisoned"))?;
-                rx.recv()
-            };
-            match message {
-                Ok(StreamMessage::Data(data)) => {
-                    if !data.is_empty() {
+            // One lock per refill: block for the next message, then take
+            // everything else already queued behind it.
+            let rx = self
+                .rx
+                .lock()
+                .map_err(|_| std::io::Error::new(std::io::ErrorKind::Other, "rx poisoned"))?;
+            let mut message = rx.recv().map_err(|_| ());
+            loop {
+                match message {
+                    Ok(StreamMessage::Data(data)) => {
                         self.cursor.get_mut().extend_from_slice(&data);
                     }
+                    Ok(StreamMessage::End) | Err(()) => {
+                        self.ended = true;
+                        break;
+                    }
                 }
-                Ok(StreamMessage::End) | Err(_) => {
-                    self.ended = true;
+                match rx.try_recv() {
+                    Ok(next) => message = Ok(next),
+                    Err(std_mpsc::TryRecvError::Empty) => break,
+                    Err(std_mpsc::TryRecvError::Disconnected) => message = Err(()),
                 }
             }
         }
@@ -575,14 +621,17 @@ impl Read for Mp3StreamReader {
         let to_copy = available.min(out.len());
         out[..to_copy].copy_from_slice(&self.cursor.get_ref()[pos..pos + to_copy]);
         self.cursor.set_position((pos + to_copy) as u64);
+        self.release_consumed();
         Ok(to_copy)
     }
 }
 
 impl Seek for Mp3StreamReader {
     fn seek(&mut self, pos: SeekFrom) -> std::io::Result<u64> {
-        let len = self.cursor.get_ref().len();
-        let current = self.cursor.position() as i64;
+        // Positions are stream offsets; `base` maps them into `cursor`.
+        let base = self.base as i64;
+        let len = base + self.cursor.get_ref().len() as i64;
+        let current = base + self.cursor.position() as i64;
         let next = match pos {
             SeekFrom::Start(value) => value as i64,
             SeekFrom::Current(offset) => current + offset,
@@ -593,23 +642,23 @@ impl Seek for Mp3StreamReader {
                         "stream end unknown",
                     ));
                 }
-                len as i64 + offset
+                len + offset
             }
         };
 
-        if next < 0 || next as usize > len {
+        if next < base || next > len {
             return Err(std::io::Error::new(
                 std::io::ErrorKind::InvalidInput,
                 "invalid seek",
             ));
         }
-        self.cursor.set_position(next as u64);
-        Ok(self.cursor.position())
+        self.cursor.set_position((next - base) as u64);
+        Ok(next as u64)
     }
 }
 
 fn run_mp3_stream(
-    handle: &Mixer,
+    sink: Arc<Sink>,
     rx: std_mpsc::Receiver<StreamMessage>,
     stop: Arc<AtomicBool>,
     timings: Arc<Mutex<StreamTimings>>,
@@ -618,8 +667,9 @@ fn run_mp3_stream(
     generation: u64,
 ) {
     let rx = Arc::new(Mutex::new(rx));
+    // Not wrapped in a BufReader: chunks are already held in memory and the
+    // decoder buffers its reads, so another layer only adds a copy.
     let reader = Mp3StreamReader::new(rx, vec![], false);
-    let reader = BufReader::new(reader);
     let decoder = match Decoder::new(reader) {
         Ok(decoder) => decoder,
         Err(err) => {
@@ -627,9 +677,6 @@ fn run_mp3_stream(
             return;
         }
     };
-    let sink = Sink::connect_new(&handle);
-    sink.play();
-
     let sample_rate = decoder.sample_rate();
     let channels = decoder.channels();
     if sample_rate > 0 && channels > 0 {
@@ -651,21 +698,22 @@ fn run_mp3_stream(
     };
 
     sink.append(stereo_iter);
+    // Appending restarts a stopped sink, so a stop that raced the append
+    // has to be applied again; any later stop reaches the sink directly.
+    if stop.load(Ordering::SeqCst) {
+        sink.stop();
+    }
 
-    loop {
-        if stop.load(Ordering::SeqCst) {
-            sink.stop();
-            log_total_playback("mp3", timings, true);
-            break;
-        }
-        if sink.empty() {
-            log_total_playback("mp3", timings, false);
-            if playback_generation.load(Ordering::SeqCst) == generation {
-                let _ = events.send(VoiceOutputEvent::Finished);
-            }
-            break;
-        }
-        std::thread::sleep(Duration::from_millis(20));
+    // Woken by the end of playback or by `StreamState::stop`, instead of
+    // polling the sink.
+    sink.sleep_until_end();
+    if stop.load(Ordering::SeqCst) {
+        log_total_playback("mp3", timings, true);
+        return;
+    }
+    log_total_playback("mp3", timings, false);
+    if playback_generation.load(Ordering::SeqCst) == generation {
+        let _ = events.send(VoiceOutputEvent::Finished);
     }
 }
 
@@ -774,20 +822,29 @@ fn open_output_stream() -> Result<OutputStream, String> {
         });
 
     if let Some(name) = requested_device {
-        let devices: Vec<cpal::Device> = host
+        let devices: Vec<(cpal::Device, Option<String>)> = host
             .output_devices()
             .map_err(|err| format!("failed to list output devices: {}", err))?
+            .map(|device| {
+                let name = device.name().ok();
+                (device, name)
+            })
             .collect();
-        let available: Vec<String> = devices
+        let available: Vec<&str> = devices
             .iter()
-            .filter_map(|device| device.name().ok())
+            .filter_map(|(_, name)| name.as_deref())
             .collect();
         tracing::info!("available output devices: {:?}", available);
-        let device = devices
+        let (device, device_name) = devices
             .into_iter()
-            .find(|device| device.name().map(|n| n.contains(&name)).unwrap_or(false))
+            .find(|(_, device_name)| {
+                device_name
+                    .as_deref()
+                    .map(|n| n.contains(&name))
+                    .unwrap_or(false)
+            })
             .ok_or_else(|| format!("output device '{}' not found", name))?;
-        let device_name = device.name().unwrap_or_else(|_| "unknown".to_string());
+        let device_name = device_name.unwrap_or_else(|| "unknown".to_string());
         
         let stream = OutputStreamBuilder::from_device(device)
             .map_err(|err| format!("output device '{}' failed: {}", device_name, err))?;
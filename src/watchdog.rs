@@ -1,7 +1,7 @@
-use std::sync::Arc;
+use std::sync::{Arc, RwLock};
 use std::time::{Duration, Instant};
 
-use tokio::sync::{mpsc, watch, RwLock};
+use tokio::sync::{mpsc, watch};
 use tokio::task::JoinHandle;
 use tokio::time;
 
@@ -17,15 +17,27 @@ impl<T> CommandHandle<T> {
         }
     }
 
+    /// Sends through the current task's channel. The sender is cloned out of
+    /// the lock so a full channel never holds it while waiting for capacity.
     pub async fn send(&self, command: T) -> Result<(), mpsc::error::SendError<T>> {
-        let sender = self.sender.read().await;
+        let sender = self.current();
         sender.send(command).await
     }
 
     pub async fn replace(&self, sender: mpsc::Sender<T>) {
-        let mut guard = self.sender.write().await;
+        let mut guard = self
+            .sender
+            .write()
+            .unwrap_or_else(|poisoned| poisoned.into_inner());
         *guard = sender;
     }
+
+    fn current(&self) -> mpsc::Sender<T> {
+        self.sender
+            .read()
+            .unwrap_or_else(|poisoned| poisoned.into_inner())
+            .clone()
+    }
 }
 
 #[derive(Clone)]
@@ -73,20 +85,22 @@ pub async fn supervise<T, F, Fut>(
         let task_shutdown = shutdown.clone();
         let mut join = tokio::spawn(spawn(rx, heartbeat, task_shutdown));
 
-        let mut interval = time::interval(Duration::from_millis(250));
+        // Sleep until the heartbeat would be overdue and push the deadline out
+        // on every beat, instead of waking on a fixed tick to check it.
+        let last = *heartbeat_rx.borrow();
+        let deadline = time::sleep_until(time::Instant::from_std(last + heartbeat_timeout));
+        tokio::pin!(deadline);
+        let mut heartbeat_open = true;
         loop {
             tokio::select! {
                 _ = shutdown.changed() => {
                     join.abort();
                     return;
                 }
-                _ = interval.tick() => {
-                    let last = *heartbeat_rx.borrow();
-                    if last.elapsed() > heartbeat_timeout {
-                        tracing::warn!(task = name, "watchdog timeout, restarting task");
-                        join.abort();
-                        break;
-                    }
+                _ = &mut deadline => {
+                    tracing::warn!(task = name, "watchdog timeout, restarting task");
+                    join.abort();
+                    break;
                 }
                 result = &mut join => {
                     if result.is_err() {
@@ -96,8 +110,16 @@ pub async fn supervise<T, F, Fut>(
                     }
                     break;
                 }
-                _ = heartbeat_rx.changed() => {
-                    // heartbeat updated
+                changed = heartbeat_rx.changed(), if heartbeat_open => {
+                    if changed.is_err() {
+                        // Every Heartbeat was dropped; let the deadline expire.
+                        heartbeat_open = false;
+                        continue;
+                    }
+                    let last = *heartbeat_rx.borrow();
+                    deadline
+                        .as_mut()
+                        .reset(time::Instant::from_std(last + heartbeat_timeout));
                 }
             }
         }